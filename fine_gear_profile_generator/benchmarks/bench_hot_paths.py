@@ -0,0 +1,331 @@
+"""
+Benchmark suite for the hot paths of the Fine Gear Profile Generator.
+
+Every case records wall time (per call, averaged over enough calls to fill a
+timeit autorange window), peak Python memory (tracemalloc) and output size.
+Unit-profile caches are cleared before every run, so cases time the cold path;
+the `*_cached` cases time repeated calls with the cache warm.
+Results can be saved as a JSON baseline and later compared against it.
+Run as a module from the project's parent directory, e.g.:
+
+    python -m fine_gear_profile_generator.benchmarks.bench_hot_paths --save
+    python -m fine_gear_profile_generator.benchmarks.bench_hot_paths --compare
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import matplotlib
+matplotlib.use('Agg')  # Benchmarks must run offline on a headless box
+
+import numpy as np
+
+from ..core import gear_core, gear_math, geometry_generator, profile_templates, transformations
+from ..io import dxf_exporter, image_exporter
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+# Absolute slowdown (seconds per call) a case must also exceed before it is flagged;
+# below it the relative threshold measures timer and scheduler noise, not the code.
+DEFAULT_NOISE_FLOOR = 100e-6
+# DXF headers carry timestamps, so file sizes wobble by a few bytes between runs.
+SIZE_TOLERANCE = 0.01
+
+BASE_PARAMS = {
+    'M': 1.0, 'ALPHA': 20.0, 'X': 0.0, 'x2': 0.0, 'B': 0.0,
+    'A': 1.0, 'D': 1.25, 'C': 0.25, 'E': 0.1,
+    'X_0': 0.0, 'Y_0': 0.0,
+}
+
+SEG_DENSITIES = {
+    'coarse': {'SEG_INVOLUTE': 5, 'SEG_EDGE_R': 5, 'SEG_ROOT_R': 5, 'SEG_OUTER': 2, 'SEG_ROOT': 2},
+    'default': {'SEG_INVOLUTE': 15, 'SEG_EDGE_R': 15, 'SEG_ROOT_R': 15, 'SEG_OUTER': 5, 'SEG_ROOT': 5},
+    'fine': {'SEG_INVOLUTE': 60, 'SEG_EDGE_R': 30, 'SEG_ROOT_R': 30, 'SEG_OUTER': 10, 'SEG_ROOT': 10},
+}
+
+# Single-gear tooth counts; negative values are internal (ring) gears.
+TOOTH_COUNTS = [10, 100, 1000, 5000, -100, -1000, -5000]
+
+# (z1, z2) pairs; a negative z2 meshes a pinion inside a ring gear.
+GEAR_PAIRS = [(10, 36), (100, 150), (1000, 1200), (5000, 5100), (20, -100), (100, -1000), (200, -5000)]
+
+QUICK_LIMIT = 1000
+
+
+def _params(seg: str, z1: int, z2: int) -> Dict[str, Any]:
+    params = dict(BASE_PARAMS)
+    params.update(SEG_DENSITIES[seg])
+    params['Z'] = z1
+    params['z2'] = z2
+    return params
+
+
+def _tooth_args(params: Dict[str, Any], z: int) -> tuple:
+    return (
+        params['M'], z, params['ALPHA'], params['X'], params['B'],
+        params['A'], params['D'], params['C'], params['E'],
+        params['SEG_INVOLUTE'], params['SEG_EDGE_R'], params['SEG_ROOT_R'],
+        params['SEG_OUTER'], params['SEG_ROOT']
+    )
+
+
+def _bench_tooth_profile(params: Dict[str, Any], workdir: str) -> int:
+    X_tooth, _, _, _, _ = geometry_generator.generate_tooth_profile(*_tooth_args(params, params['Z']))
+    return int(X_tooth.size)
+
+
+def _bench_contact_ratio(params: Dict[str, Any], workdir: str) -> int:
+    gear_math.calculate_contact_ratio(
+        params['M'], params['Z'], params['z2'], params['X'], params['x2'], params['ALPHA'], params['A']
+    )
+    return 2
+
+
+def _bench_circular_pattern(params: Dict[str, Any], workdir: str) -> int:
+    X_tooth, Y_tooth, Z_calc, P_ANGLE, ALIGN_ANGLE = params['_profile']
+    all_X, _ = transformations.create_circular_pattern(X_tooth, Y_tooth, Z_calc, P_ANGLE, ALIGN_ANGLE)
+    return int(sum(x.size for x in all_X))
+
+
+def _bench_gear_pair(params: Dict[str, Any], workdir: str) -> int:
+    result = gear_core.generate_gear_pair(params)
+    return int(result['gear1']['profile'][0].size + result['gear2']['profile'][0].size)
+
+
+def _bench_dxf_export(params: Dict[str, Any], workdir: str) -> int:
+    result = params['_pair']
+    dxf_exporter.export_gear_pair_to_dxf(
+        workdir, result['gear1']['profile'], result['gear2']['profile'],
+        result['analysis']['center_distance'], params['X_0'], params['Y_0']
+    )
+    return os.path.getsize(os.path.join(workdir, 'Result_Gear_Pair.dxf'))
+
+
+def _bench_png_export(params: Dict[str, Any], workdir: str) -> int:
+    result = params['_pair']
+    image_exporter.export_gear_pair_to_image(
+        workdir, result['gear1']['profile'], result['gear2']['profile'],
+        result['analysis']['center_distance'], params['M'], params['Z'], params['z2'],
+        params['X_0'], params['Y_0']
+    )
+    return os.path.getsize(os.path.join(workdir, 'Result1.png'))
+
+
+# name -> (function, output unit, case axis, prepared input, warm caches)
+BENCHMARKS = {
+    'generate_tooth_profile': (_bench_tooth_profile, 'points', 'tooth', None, False),
+    'calculate_contact_ratio': (_bench_contact_ratio, 'values', 'pair', None, False),
+    'create_circular_pattern': (_bench_circular_pattern, 'points', 'tooth', '_profile', False),
+    'generate_gear_pair': (_bench_gear_pair, 'points', 'pair', None, False),
+    'generate_gear_pair_cached': (_bench_gear_pair, 'points', 'pair', None, True),
+    'dxf_export': (_bench_dxf_export, 'bytes', 'pair', '_pair', False),
+    'png_export': (_bench_png_export, 'bytes', 'pair', '_pair', False),
+}
+
+
+def build_cases(quick: bool = False, only: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Expand the benchmark matrix into a flat list of cases."""
+    cases = []
+    for bench_name, (_, unit, axis, _, _) in BENCHMARKS.items():
+        if only and bench_name not in only:
+            continue
+        # The contact ratio does not depend on the segment counts.
+        densities = ['default'] if bench_name == 'calculate_contact_ratio' else list(SEG_DENSITIES)
+        if axis == 'tooth':
+            combos = [(z, 36) for z in TOOTH_COUNTS]
+        else:
+            combos = list(GEAR_PAIRS)
+        for seg in densities:
+            for z1, z2 in combos:
+                if quick and max(abs(z1), abs(z2)) > QUICK_LIMIT:
+                    continue
+                case_id = f"{bench_name}[seg={seg},z1={z1}]" if axis == 'tooth' else f"{bench_name}[seg={seg},z1={z1},z2={z2}]"
+                cases.append({
+                    'id': case_id, 'bench': bench_name, 'seg': seg,
+                    'z1': z1, 'z2': z2, 'unit': unit,
+                })
+    return cases
+
+
+def _prepare(case: Dict[str, Any]) -> Dict[str, Any]:
+    params = _params(case['seg'], case['z1'], case['z2'])
+    prepared = BENCHMARKS[case['bench']][3]
+    if prepared == '_profile':
+        params['_profile'] = geometry_generator.generate_tooth_profile(*_tooth_args(params, params['Z']))
+    elif prepared == '_pair':
+        params['_pair'] = gear_core.generate_gear_pair(params)
+    return params
+
+
+def _reset_caches(warm: bool) -> None:
+    # The LRU cache would otherwise turn every repetition after the first into a lookup
+    if not warm:
+        profile_templates._generate_unit_profile.cache_clear()
+
+
+def run_case(case: Dict[str, Any], repeat: int = 3) -> Dict[str, Any]:
+    """
+    Run one case: best-of-`repeat` per-call wall time, each repetition averaging as
+    many calls as timeit's autorange needs to fill 0.2 s, then one traced run for
+    peak memory.
+    """
+    func, _, _, _, warm = BENCHMARKS[case['bench']]
+    params = _prepare(case)
+    with tempfile.TemporaryDirectory(prefix='fgpg_bench_') as workdir:
+        if warm:
+            func(params, workdir)
+        output_size = 0
+
+        def call():
+            nonlocal output_size
+            _reset_caches(warm)
+            output_size = func(params, workdir)
+
+        timer = timeit.Timer(call)
+        timings = []
+        for _ in range(max(1, repeat)):
+            loops, total = timer.autorange()
+            timings.append(total / loops)
+
+        _reset_caches(warm)
+        tracemalloc.start()
+        try:
+            func(params, workdir)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'time_s': min(timings),
+        'peak_mem_bytes': int(peak),
+        'output_size': int(output_size),
+        'output_unit': case['unit'],
+    }
+
+
+def run_suite(cases: List[Dict[str, Any]], repeat: int = 3,
+              progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Run all cases and return a baseline-shaped document."""
+    results = {}
+    for case in cases:
+        results[case['id']] = run_case(case, repeat)
+        if progress:
+            progress(case['id'], results[case['id']])
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'matplotlib': matplotlib.__version__,
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'timer': 'autorange',
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+            noise_floor: float = DEFAULT_NOISE_FLOOR) -> List[Dict[str, Any]]:
+    """
+    Compares a run against a baseline.
+
+    Returns one entry per metric that grew by more than `threshold` (a fraction,
+    e.g. 0.25 for +25%); a time must also have grown by more than `noise_floor`
+    seconds. Output size changes beyond SIZE_TOLERANCE in either direction are
+    reported too, since they indicate the generated geometry itself has changed.
+    """
+    regressions = []
+    base_results = baseline.get('results', {})
+    for case_id, cur in current.get('results', {}).items():
+        base = base_results.get(case_id)
+        if base is None:
+            continue
+        for metric in ('time_s', 'peak_mem_bytes'):
+            floor = noise_floor if metric == 'time_s' else 0
+            if base[metric] > 0 and cur[metric] > base[metric] * (1 + threshold) + floor:
+                regressions.append({
+                    'case': case_id, 'metric': metric,
+                    'baseline': base[metric], 'current': cur[metric],
+                    'ratio': cur[metric] / base[metric],
+                })
+        if abs(cur['output_size'] - base['output_size']) > base['output_size'] * SIZE_TOLERANCE:
+            regressions.append({
+                'case': case_id, 'metric': 'output_size',
+                'baseline': base['output_size'], 'current': cur['output_size'],
+                'ratio': cur['output_size'] / base['output_size'] if base['output_size'] else float('inf'),
+            })
+    return regressions
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, document: Dict[str, Any]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _print_progress(case_id: str, result: Dict[str, Any]) -> None:
+    print(f"{case_id:<60} {result['time_s'] * 1e3:10.3f} ms "
+          f"{result['peak_mem_bytes'] / 1024:10.1f} KiB "
+          f"{result['output_size']:>10} {result['output_unit']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the gear generation and export hot paths.")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Path of the JSON baseline file.')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--save', action='store_true', help='Write the results as the new baseline.')
+    mode.add_argument('--compare', action='store_true', help='Compare the results against the baseline.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed relative growth before a metric is flagged (default: 0.25).')
+    parser.add_argument('--noise-floor', type=float, default=DEFAULT_NOISE_FLOOR,
+                        help='Absolute slowdown in seconds per call a case must also exceed '
+                             f'(default: {DEFAULT_NOISE_FLOOR:g}).')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per case (best is kept).')
+    parser.add_argument('--quick', action='store_true',
+                        help=f'Skip cases with more than {QUICK_LIMIT} teeth.')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS),
+                        help='Restrict the run to the given benchmark (repeatable).')
+    args = parser.parse_args(argv)
+
+    cases = build_cases(quick=args.quick, only=args.only)
+    current = run_suite(cases, repeat=args.repeat, progress=_print_progress)
+
+    if args.save:
+        save_baseline(args.baseline, current)
+        print(f"Baseline with {len(cases)} cases saved to {args.baseline}")
+        return 0
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"Error: Baseline file not found: {args.baseline}", file=sys.stderr)
+            return 2
+        regressions = compare(load_baseline(args.baseline), current, args.threshold, args.noise_floor)
+        if not regressions:
+            print(f"No regressions above {args.threshold:.0%}.")
+            return 0
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"  {r['case']:<60} {r['metric']:<15} {r['baseline']:>14.6g} -> {r['current']:<14.6g} (x{r['ratio']:.2f})")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
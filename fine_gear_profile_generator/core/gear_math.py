@@ -3,28 +3,49 @@ import numpy as np
 FULL_TURN = 2 * np.pi
 RIGHT_ANGLE = np.pi / 2
 
+def select(condition, if_true, if_false):
+    """
+    Branch-free conditional. A scalar condition returns one of the arguments as is;
+    an array condition (one entry per design when parameters are arrays) selects
+    elementwise, so the functions below also evaluate many designs at once.
+    """
+    if np.ndim(condition) == 0:
+        return if_true if condition else if_false
+    return np.where(condition, if_true, if_false)
+
 def inv(alpha_rad):
     """Calculates the involute function (tan(a) - a)"""
     return np.tan(alpha_rad) - alpha_rad
 
+def operating_involute(z1, z2, x1, x2, alpha_deg):
+    """Involute of the operating pressure angle, inv(alpha_w)."""
+    alpha_rad = np.deg2rad(alpha_deg)
+    return inv(alpha_rad) + 2 * (x1 + x2) * np.tan(alpha_rad) / (z1 + z2)
+
 def calculate_operating_pressure_angle(z1, z2, x1, x2, alpha_deg):
     """Calculates the operating pressure angle."""
     alpha_rad = np.deg2rad(alpha_deg)
-    inv_alpha_w = inv(alpha_rad) + 2 * (x1 + x2) * np.tan(alpha_rad) / (z1 + z2)
+    inv_alpha_w = operating_involute(z1, z2, x1, x2, alpha_deg)
     # Using a simple iterative solver to find the angle from its involute
     alpha_w = alpha_rad  # Start with the standard pressure angle as an initial guess
     for _ in range(10): # 10 iterations are usually more than enough
         f = inv(alpha_w) - inv_alpha_w
         f_prime = np.tan(alpha_w)**2
-        if abs(f_prime) < 1e-9:  # Avoid division by zero
+        small = np.abs(f_prime) < 1e-9  # Avoid division by zero
+        if np.all(small):
             break
-        alpha_w = alpha_w - f / f_prime
+        alpha_w = alpha_w - select(small, 0.0, f / select(small, 1.0, f_prime))
     return alpha_w
 
-def calculate_contact_ratio(m, z1, z2, x1, x2, alpha_deg, a1=1.0):
-    """Calculates the contact ratio for a pair of spur gears."""
+def calculate_contact_ratio(m, z1, z2, x1, x2, alpha_deg, a1=1.0, alpha_w_rad=None):
+    """
+    Calculates the contact ratio for a pair of spur gears.
+
+    `alpha_w_rad` is the operating pressure angle if already known; it is solved for otherwise.
+    """
     alpha_rad = np.deg2rad(alpha_deg)
-    alpha_w_rad = calculate_operating_pressure_angle(z1, z2, x1, x2, alpha_deg)
+    if alpha_w_rad is None:
+        alpha_w_rad = calculate_operating_pressure_angle(z1, z2, x1, x2, alpha_deg)
 
     # Center distance modification due to profile shift
     c = m * (z1 + z2) / 2 * (np.cos(alpha_rad) / np.cos(alpha_w_rad))
@@ -40,18 +61,19 @@ def calculate_contact_ratio(m, z1, z2, x1, x2, alpha_deg, a1=1.0):
     # Check for valid square root arguments
     val1 = ra1**2 - rb1**2
     val2 = ra2**2 - rb2**2
-    if val1 < 0 or val2 < 0:
+    invalid = (val1 < 0) | (val2 < 0)
+    if np.all(invalid):
         return 0, c # Cannot calculate contact ratio if addendum is below base circle
 
-    # Length of the path of contact
-    g_alpha = (np.sqrt(val1) + np.sqrt(val2)) - c * np.sin(alpha_w_rad)
+    # Length of the path of contact (designs with an invalid root get 0 below)
+    g_alpha = (np.sqrt(np.maximum(val1, 0)) + np.sqrt(np.maximum(val2, 0))) - c * np.sin(alpha_w_rad)
 
     # Base pitch
     pb = m * np.pi * np.cos(alpha_rad)
 
     # Contact ratio
     epsilon_alpha = g_alpha / pb
-    return epsilon_alpha, c
+    return select(invalid, 0, epsilon_alpha), c
 
 def check_undercut(Z, ALPHA, X, A):
     """Checks for undercut on a single gear."""
@@ -66,12 +88,10 @@ def check_undercut(Z, ALPHA, X, A):
 
 def handle_internal_gear_parameters(Z, X, B, A, D, C, E):
     """Normalizes parameters for internal gears by inverting them."""
-    if Z < 0:
-        # For internal gears, conventions are often inverted
-        Z, X, B = -Z, -X, -B
-        A, D = D, A
-        C, E = E, C
-    return Z, X, B, A, D, C, E
+    internal = np.less(Z, 0)
+    # For internal gears, conventions are often inverted
+    return (select(internal, -Z, Z), select(internal, -X, X), select(internal, -B, B),
+            select(internal, D, A), select(internal, A, D), select(internal, E, C), select(internal, C, E))
 
 def calculate_gear_parameters(M, Z, ALPHA, X, B, A, D, C, E):
     """
@@ -86,21 +106,16 @@ def calculate_gear_parameters(M, Z, ALPHA, X, B, A, D, C, E):
     ALPHA_IS = ALPHA_0 + HALF_TOOTH_CENTER_ANGLE + B / (Z * np.cos(ALPHA_0)) - (1 + 2 * X / Z) * np.sin(ALPHA_0) / np.cos(ALPHA_0)
     THETA_IS = np.tan(ALPHA_0) + 2 * (C * (1 - np.sin(ALPHA_0)) + X - D) / (Z * np.cos(ALPHA_0) * np.sin(ALPHA_0))
 
-    sqrt_val_ie = ((Z + 2 * (X + A - E)) / (Z * np.cos(ALPHA_0)))**2 - 1
-    if sqrt_val_ie < 0:
-        sqrt_val_ie = 0
+    sqrt_val_ie = np.maximum(((Z + 2 * (X + A - E)) / (Z * np.cos(ALPHA_0)))**2 - 1, 0)
     THETA_IE = 2 * E / (Z * np.cos(ALPHA_0)) + np.sqrt(sqrt_val_ie)
 
-    sqrt_val_ae = ((Z + 2 * (X + A - E)) / (Z * np.cos(ALPHA_0)))**2 - 1
-    if sqrt_val_ae < 0:
-        sqrt_val_ae = 0
+    sqrt_val_ae = np.maximum(((Z + 2 * (X + A - E)) / (Z * np.cos(ALPHA_0)))**2 - 1, 0)
     ALPHA_E = ALPHA_IS + THETA_IE - np.arctan(np.sqrt(sqrt_val_ae))
 
-    if (ALPHA_E > ALPHA_M) and (ALPHA_M > ALPHA_IS + THETA_IE - np.arctan(THETA_IE)):
-        sqrt_val_e = (1 / np.cos(ALPHA_IS + THETA_IE - ALPHA_M))**2 - 1
-        if sqrt_val_e < 0:
-            sqrt_val_e = 0
-        E = (E / 2) * np.cos(ALPHA_0) * (THETA_IE - np.sqrt(sqrt_val_e))
+    shrink_edge = (ALPHA_E > ALPHA_M) & (ALPHA_M > ALPHA_IS + THETA_IE - np.arctan(THETA_IE))
+    if np.any(shrink_edge):
+        sqrt_val_e = np.maximum((1 / np.cos(ALPHA_IS + THETA_IE - ALPHA_M))**2 - 1, 0)
+        E = select(shrink_edge, (E / 2) * np.cos(ALPHA_0) * (THETA_IE - np.sqrt(sqrt_val_e)), E)
 
     ALIGN_ANGLE = RIGHT_ANGLE - TOOTH_CENTER_ANGLE
 
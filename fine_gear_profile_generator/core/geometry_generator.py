@@ -22,12 +22,12 @@ def root_round_curve(M, Z, X, D, C, B, THETA_TE, ALPHA_TS, SEG_ROOT_R):
     """Generates the trochoidal root fillet curve."""
     THETA_T = np.linspace(0, THETA_TE, SEG_ROOT_R)
     denominator = M * D - M * X - M * C
-    if (C != 0) and (denominator == 0):
-        THETA_S = (np.pi / 2) * np.ones(len(THETA_T))
-    elif denominator != 0:
-        THETA_S = np.arctan((M * Z * THETA_T / 2) / denominator)
-    else:
-        THETA_S = np.zeros(len(THETA_T))
+    # Where the denominator vanishes the angle is pi/2 (or 0 without a fillet radius)
+    vanishing = denominator == 0
+    THETA_S = gear_math.select(
+        vanishing, gear_math.select(C != 0, np.pi / 2, 0.0),
+        np.arctan((M * Z * THETA_T / 2) / gear_math.select(vanishing, 1.0, denominator))
+    )
     X31 = M * ((Z / 2 + X - D + C) * np.cos(THETA_T + ALPHA_TS) + (Z / 2) * THETA_T * np.sin(THETA_T + ALPHA_TS) - C * np.cos(THETA_S + THETA_T + ALPHA_TS))
     Y31 = M * ((Z / 2 + X - D + C) * np.sin(THETA_T + ALPHA_TS) - (Z / 2) * THETA_T * np.cos(THETA_T + ALPHA_TS) - C * np.sin(THETA_S + THETA_T + ALPHA_TS))
     return X31, Y31
@@ -0,0 +1,230 @@
+"""
+Module-normalized tooth profile templates.
+
+Every coordinate produced by geometry_generator is linear in the module M, while
+the tooth shape only depends on Z, ALPHA, X, B, A, D, C, E and the segment counts.
+Profiles are therefore generated once for M = 1 and scaled on demand with a single
+multiply, which turns a family of N modules into one generation.
+
+Unit profiles come from, in order: the precomputed template pack for the standard
+tooth systems (memory-mapped .npy file plus a JSON index), an in-process LRU cache,
+and finally geometry_generator.generate_tooth_profile.
+
+The pack index records a hash of the generator sources it was built from. A pack
+whose hash no longer matches is ignored with a warning (profiles are then generated
+on demand), so an edit to the geometry can never be masked by stale templates.
+The pack is only written by running this module.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import warnings
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import gear_math, geometry_generator, transformations
+
+PACK_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+DEFAULT_PACK = os.path.join(PACK_DIR, 'standard_pack')
+PACK_VERSION = 2
+# Modules whose code determines the generated profiles
+GENERATOR_MODULES = (geometry_generator, gear_math, transformations)
+
+SHAPE_PARAMS = ('Z', 'ALPHA', 'X', 'B', 'A', 'D', 'C', 'E',
+                'SEG_INVOLUTE', 'SEG_EDGE_R', 'SEG_ROOT_R', 'SEG_OUTER', 'SEG_ROOT')
+
+# Basic rack profiles shipped in the template pack (ISO 53 types A-D, plus the
+# A/D/C/E coefficients of this tool's fine-pitch defaults), all at X = B = 0.
+# Other shapes fall back to the LRU cache, except the default design below.
+STANDARD_TOOTH_SYSTEMS = {
+    'iso53_a': {'ALPHA': 20.0, 'A': 1.0, 'D': 1.25, 'C': 0.38, 'E': 0.0},
+    'iso53_b': {'ALPHA': 20.0, 'A': 1.0, 'D': 1.25, 'C': 0.3, 'E': 0.0},
+    'iso53_c': {'ALPHA': 20.0, 'A': 1.0, 'D': 1.25, 'C': 0.25, 'E': 0.0},
+    'iso53_d': {'ALPHA': 20.0, 'A': 1.0, 'D': 1.4, 'C': 0.39, 'E': 0.0},
+    'fine_pitch': {'ALPHA': 20.0, 'A': 1.0, 'D': 1.25, 'C': 0.2, 'E': 0.1},
+}
+STANDARD_SEGMENTS = {'SEG_INVOLUTE': 15, 'SEG_EDGE_R': 15, 'SEG_ROOT_R': 15, 'SEG_OUTER': 5, 'SEG_ROOT': 5}
+STANDARD_TEETH = list(range(6, 121)) + list(range(-120, -23))
+# Both gears of the design the GUI and headless runs start from (the defaults in
+# utils.config_manager), with their profile shift and backlash
+DEFAULT_DESIGN_GEARS = ({'Z': 25, 'X': 0.2, 'B': 0.05}, {'Z': 36, 'X': 0.0, 'B': 0.05})
+
+UnitProfile = Tuple[np.ndarray, np.ndarray, int, float, float]
+
+
+def template_key(Z, ALPHA, X, B, A, D, C, E, SEG_INVOLUTE, SEG_EDGE_R, SEG_ROOT_R, SEG_OUTER, SEG_ROOT) -> tuple:
+    """Canonical, hashable key of a tooth shape (floats rounded to absorb parsing noise)."""
+    floats = tuple(round(float(v), 9) + 0.0 for v in (ALPHA, X, B, A, D, C, E))
+    ints = tuple(int(v) for v in (SEG_INVOLUTE, SEG_EDGE_R, SEG_ROOT_R, SEG_OUTER, SEG_ROOT))
+    return (int(Z),) + floats + ints
+
+
+def generator_fingerprint() -> str:
+    """SHA-256 of the generator sources (line endings normalized) and the pack version."""
+    digest = hashlib.sha256(f"pack-v{PACK_VERSION}".encode('ascii'))
+    for module in GENERATOR_MODULES:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read().replace(b'\r\n', b'\n'))
+    return digest.hexdigest()
+
+
+class TemplatePack:
+    """
+    A read-only set of unit-module profiles backed by a memory-mapped array.
+
+    The pack is two files: `<path>.npy` with all points as an (N, 2) float64 array
+    and `<path>.json` mapping each template key to its slice and angles, plus the
+    `generator` fingerprint the pack was built with.
+    """
+
+    def __init__(self, path: str):
+        with open(path + '.json', 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != PACK_VERSION:
+            raise ValueError(f"Unsupported template pack version {index.get('version')} in {path}.json")
+        self.path = path
+        self.generator = index.get('generator')
+        self.points = np.load(path + '.npy', mmap_mode='r')
+        self.entries: Dict[tuple, list] = {tuple(json.loads(k)): v for k, v in index['entries'].items()}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.entries
+
+    def is_stale(self) -> bool:
+        """True if the pack was built by a different version of the generator."""
+        return self.generator != generator_fingerprint()
+
+    def get(self, key: tuple) -> Optional[UnitProfile]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        offset, count, Z_calc, P_ANGLE, ALIGN_ANGLE = entry
+        block = self.points[offset:offset + count]
+        return block[:, 0], block[:, 1], int(Z_calc), P_ANGLE, ALIGN_ANGLE
+
+
+def build_template_pack(path: str, keys: Iterable[tuple]) -> int:
+    """Generates unit-module profiles for `keys` and writes them as a template pack."""
+    blocks, entries, offset = [], {}, 0
+    for key in keys:
+        X, Y, Z_calc, P_ANGLE, ALIGN_ANGLE = geometry_generator.generate_tooth_profile(1.0, *key)
+        blocks.append(np.column_stack((X, Y)))
+        entries[json.dumps(list(key))] = [offset, len(X), int(Z_calc), float(P_ANGLE), float(ALIGN_ANGLE)]
+        offset += len(X)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Write next to the target and rename, data first, so readers never see a torn pack
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp + '.npy', 'wb') as f:
+        np.save(f, np.vstack(blocks) if blocks else np.zeros((0, 2)))
+    os.replace(tmp + '.npy', path + '.npy')
+    with open(tmp + '.json', 'w', encoding='utf-8') as f:
+        json.dump({'version': PACK_VERSION, 'generator': generator_fingerprint(), 'entries': entries},
+                  f, separators=(',', ':'))
+    os.replace(tmp + '.json', path + '.json')
+    return len(entries)
+
+
+def standard_template_keys() -> List[tuple]:
+    keys = []
+    for system in STANDARD_TOOTH_SYSTEMS.values():
+        for Z in STANDARD_TEETH:
+            keys.append(template_key(Z=Z, X=0.0, B=0.0, **system, **STANDARD_SEGMENTS))
+    for gear in DEFAULT_DESIGN_GEARS:
+        keys.append(template_key(**gear, **STANDARD_TOOTH_SYSTEMS['fine_pitch'], **STANDARD_SEGMENTS))
+    return keys
+
+
+_default_pack: Optional[TemplatePack] = None
+_default_pack_loaded = False
+
+
+def _load_default_pack() -> Optional[TemplatePack]:
+    if not (os.path.exists(DEFAULT_PACK + '.npy') and os.path.exists(DEFAULT_PACK + '.json')):
+        return None
+    try:
+        pack = TemplatePack(DEFAULT_PACK)
+    except ValueError as e:
+        reason = str(e)
+    else:
+        if not pack.is_stale():
+            return pack
+        reason = "it was built by a different version of the generator"
+    warnings.warn(f"Ignoring template pack {DEFAULT_PACK}: {reason}. Profiles are generated on demand; "
+                  f"rebuild the pack with `python -m {__name__}`.")
+    return None
+
+
+def get_default_pack() -> Optional[TemplatePack]:
+    """
+    Memory-maps the shipped template pack on first use. Returns None if the pack is
+    missing or stale; it is never rebuilt implicitly.
+    """
+    global _default_pack, _default_pack_loaded
+    if not _default_pack_loaded:
+        _default_pack_loaded = True
+        _default_pack = _load_default_pack()
+    return _default_pack
+
+
+@lru_cache(maxsize=1024)
+def _generate_unit_profile(key: tuple) -> UnitProfile:
+    X, Y, Z_calc, P_ANGLE, ALIGN_ANGLE = geometry_generator.generate_tooth_profile(1.0, *key)
+    # Cached arrays are shared between callers, so they must not be modified in place
+    X.flags.writeable = False
+    Y.flags.writeable = False
+    return X, Y, Z_calc, P_ANGLE, ALIGN_ANGLE
+
+
+def unit_tooth_profile(Z, ALPHA, X, B, A, D, C, E, SEG_INVOLUTE, SEG_EDGE_R, SEG_ROOT_R, SEG_OUTER, SEG_ROOT) -> UnitProfile:
+    """Returns the read-only M = 1 profile (X_tooth, Y_tooth, Z, P_ANGLE, ALIGN_ANGLE)."""
+    key = template_key(Z, ALPHA, X, B, A, D, C, E, SEG_INVOLUTE, SEG_EDGE_R, SEG_ROOT_R, SEG_OUTER, SEG_ROOT)
+    pack = get_default_pack()
+    if pack is not None:
+        profile = pack.get(key)
+        if profile is not None:
+            return profile
+    return _generate_unit_profile(key)
+
+
+def scale_profile(profile: Sequence, M: float, x_offset: float = 0.0, y_offset: float = 0.0) -> UnitProfile:
+    """Scales a unit-module profile to module M and optionally offsets it."""
+    X_unit, Y_unit, Z_calc, P_ANGLE, ALIGN_ANGLE = profile
+    X_tooth = X_unit * M
+    Y_tooth = Y_unit * M
+    if x_offset or y_offset:
+        X_tooth += x_offset
+        Y_tooth += y_offset
+    return X_tooth, Y_tooth, Z_calc, P_ANGLE, ALIGN_ANGLE
+
+
+def tooth_profile(M, Z, ALPHA, X, B, A, D, C, E, SEG_INVOLUTE, SEG_EDGE_R, SEG_ROOT_R, SEG_OUTER, SEG_ROOT) -> UnitProfile:
+    """Drop-in replacement for geometry_generator.generate_tooth_profile using templates."""
+    unit = unit_tooth_profile(Z, ALPHA, X, B, A, D, C, E, SEG_INVOLUTE, SEG_EDGE_R, SEG_ROOT_R, SEG_OUTER, SEG_ROOT)
+    return scale_profile(unit, M)
+
+
+def module_family(modules: Sequence[float], Z, ALPHA, X, B, A, D, C, E,
+                  SEG_INVOLUTE, SEG_EDGE_R, SEG_ROOT_R, SEG_OUTER, SEG_ROOT) -> Tuple[np.ndarray, np.ndarray, int, float, float]:
+    """
+    Profiles of one tooth shape for several modules from a single generation.
+
+    Returns (X, Y, Z, P_ANGLE, ALIGN_ANGLE) where X and Y have shape (len(modules), N).
+    """
+    X_unit, Y_unit, Z_calc, P_ANGLE, ALIGN_ANGLE = unit_tooth_profile(
+        Z, ALPHA, X, B, A, D, C, E, SEG_INVOLUTE, SEG_EDGE_R, SEG_ROOT_R, SEG_OUTER, SEG_ROOT
+    )
+    scale = np.asarray(modules, dtype=float)[:, None]
+    return scale * X_unit, scale * Y_unit, Z_calc, P_ANGLE, ALIGN_ANGLE
+
+
+if __name__ == '__main__':
+    count = build_template_pack(DEFAULT_PACK, standard_template_keys())
+    print(f"Wrote {count} templates to {DEFAULT_PACK}.npy/.json")
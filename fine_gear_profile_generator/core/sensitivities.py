@@ -0,0 +1,475 @@
+"""
+Analytic parameter sensitivities of the tooth profile and the pair analysis.
+
+The existing gear_math / geometry_generator functions are evaluated with
+forward-mode dual numbers: every quantity carries its value and its gradient with
+respect to the seeded parameters, so one pass returns the exact Jacobian alongside
+the values instead of one extra evaluation per parameter for finite differences.
+
+Parameters are passed as arrays with one entry per design (and per gear), which
+gear_math and geometry_generator handle elementwise: a batch of designs, and both
+gears of a pair, run through a single vectorized pass. Value-dependent choices
+(internal gear handling, the clamped square roots) are taken elementwise on the
+values; a clamped square root is a constant, so its derivative is zero, and the
+derivative of sqrt at exactly zero is taken as zero instead of infinity. The
+operating pressure angle is solved on plain values and differentiated through its
+defining equation inv(alpha_w) = target, so the Newton iterations carry no gradients.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+from . import gear_math, geometry_generator
+
+SENSITIVITY_PARAMS = ('X', 'x2', 'B', 'C', 'E', 'ALPHA')
+DIFFERENTIABLE_PARAMS = ('M', 'ALPHA', 'X', 'x2', 'B', 'A', 'D', 'C', 'E')
+SEGMENT_PARAMS = ('SEG_INVOLUTE', 'SEG_EDGE_R', 'SEG_ROOT_R', 'SEG_OUTER', 'SEG_ROOT')
+PAIR_PARAMS = ('M', 'Z', 'z2', 'ALPHA', 'X', 'x2', 'B', 'A', 'D', 'C', 'E')
+# Tooth profile arguments as (gear 1 parameter, gear 2 parameter)
+PROFILE_PARAMS = (('M', 'M'), ('Z', 'z2'), ('ALPHA', 'ALPHA'), ('X', 'x2'), ('B', 'B'),
+                  ('A', 'A'), ('D', 'D'), ('C', 'C'), ('E', 'E'))
+
+_COMPARISONS = {np.less, np.less_equal, np.greater, np.greater_equal, np.equal, np.not_equal}
+
+
+def _parts(x) -> Tuple[Any, Any]:
+    """Returns (value, grad) of a Dual, or (x, None) for a constant."""
+    if isinstance(x, Dual):
+        return x.value, x.grad
+    return x, None
+
+
+def _col(value) -> np.ndarray:
+    # Appends the parameter axis so a value broadcasts against gradients
+    return np.asarray(value)[..., None]
+
+
+def _combine(*terms):
+    """Sums gradient terms, skipping constants (None)."""
+    total = None
+    for term in terms:
+        if term is not None:
+            total = term if total is None else total + term
+    return total
+
+
+def _is_scalar(x) -> bool:
+    # type() first: np.ndim costs more than most of the arithmetic it guards
+    return type(x) in (float, int, np.float64) or np.ndim(x) == 0
+
+
+def _fit(grad: np.ndarray, value) -> np.ndarray:
+    """Broadcasts `grad` to value.shape + (n,), e.g. after adding a constant array."""
+    shape = np.shape(value)
+    if grad.shape[:-1] != shape:
+        grad = np.broadcast_to(grad, shape + grad.shape[-1:])
+    return grad
+
+
+class Dual(NDArrayOperatorsMixin):
+    """
+    A value (scalar or array) with its gradient over n seeded parameters.
+
+    `grad` has shape value.shape + (n,). Arithmetic, numpy ufuncs, indexing,
+    np.linspace, np.concatenate and np.where propagate gradients; comparisons act
+    on values. The arithmetic operators are implemented directly, which avoids the
+    ufunc dispatch for the most frequent operations.
+    """
+
+    __slots__ = ('value', 'grad')
+
+    def __init__(self, value, grad):
+        self.value = value
+        self.grad = grad
+
+    def __repr__(self) -> str:
+        return f"Dual({self.value!r}, grad={self.grad!r})"
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __getitem__(self, index) -> 'Dual':
+        return Dual(self.value[index], self.grad[index])
+
+    def __float__(self) -> float:
+        return float(self.value)
+
+    # Gradients of two Duals are full-shaped, so their sums and products are too; only
+    # a constant array operand can widen the value beyond the gradient.
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value + other.value, self.grad + other.grad)
+        value = self.value + other
+        return Dual(value, self.grad if _is_scalar(other) else _fit(self.grad, value))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value - other.value, self.grad - other.grad)
+        value = self.value - other
+        return Dual(value, self.grad if _is_scalar(other) else _fit(self.grad, value))
+
+    def __rsub__(self, other):
+        value = other - self.value
+        return Dual(value, -self.grad if _is_scalar(other) else _fit(-self.grad, value))
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value * other.value, _col(other.value) * self.grad + _col(self.value) * other.grad)
+        if _is_scalar(other):
+            return Dual(self.value * other, self.grad * other)
+        return Dual(self.value * other, _col(other) * self.grad)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            value = self.value / other.value
+            return Dual(value, (self.grad - _col(value) * other.grad) / _col(other.value))
+        if _is_scalar(other):
+            return Dual(self.value / other, self.grad / other)
+        return Dual(self.value / other, self.grad / _col(other))
+
+    def __rtruediv__(self, other):
+        value = other / self.value
+        return Dual(value, _col(-value / self.value) * self.grad)
+
+    def __pow__(self, other):
+        if isinstance(other, Dual) or not _is_scalar(other):
+            return np.power(self, other)
+        if other == 2:
+            return Dual(self.value * self.value, _col(2 * self.value) * self.grad)
+        return Dual(self.value ** other, _col(other * self.value ** (other - 1)) * self.grad)
+
+    def __neg__(self):
+        return Dual(-self.value, -self.grad)
+
+    def __pos__(self):
+        return self
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs:
+            return NotImplemented
+        if len(inputs) == 1:
+            derivative = _DERIVATIVES.get(ufunc)
+            if derivative is not None:
+                value = ufunc(self.value)
+                return Dual(value, _col(derivative(value, self.value)) * self.grad)
+        operators = _OPERATORS.get(ufunc)
+        if operators is not None and len(inputs) == 2:
+            # e.g. a constant array times a Dual: use the operator methods directly
+            a, b = inputs
+            return operators[0](a, b) if isinstance(a, Dual) else operators[1](b, a)
+        values = [_parts(x)[0] for x in inputs]
+        if ufunc in _COMPARISONS:
+            return ufunc(*values)
+        rule = _UFUNC_RULES.get(ufunc)
+        if rule is None:
+            return NotImplemented
+        grads = [_parts(x)[1] for x in inputs]
+        value = ufunc(*values)
+        grad = rule(value, values, grads)
+        if grad is None:
+            return value
+        return Dual(value, _fit(grad, value))
+
+    def __array_function__(self, func, types, args, kwargs):
+        handler = _FUNCTION_RULES.get(func)
+        if handler is None:
+            return NotImplemented
+        return handler(*args, **kwargs)
+
+
+def _power(value, values, grads):
+    a, b = values
+    da, db = grads
+    terms = [None, None]
+    if da is not None:
+        terms[0] = _col(b * np.power(a, b - 1)) * da
+    if db is not None:
+        terms[1] = _col(value * np.log(a)) * db
+    return _combine(*terms)
+
+
+def _sqrt_derivative(value, x):
+    # d sqrt(x) = dx / (2 sqrt(x)), taken as zero where sqrt(x) == 0 (clamped roots)
+    zero = value == 0
+    return np.where(zero, 0.0, 0.5 / np.where(zero, 1.0, value))
+
+
+def _arctan2(value, values, grads):
+    y, x = values
+    dy, dx = grads
+    r2 = x * x + y * y
+    return _combine(None if dy is None else _col(x / r2) * dy,
+                    None if dx is None else _col(-y / r2) * dx)
+
+
+def _choose(condition, if_true, if_false):
+    """Selects gradients (None for constants) where `condition` holds on the values."""
+    if if_true is None and if_false is None:
+        return None
+    return np.where(_col(condition), 0.0 if if_true is None else if_true, 0.0 if if_false is None else if_false)
+
+
+def _maximum(value, values, grads):
+    # The gradient of the larger argument (a clamp at a constant has zero gradient)
+    return _choose(values[0] >= values[1], *grads)
+
+
+# Single-argument ufuncs: derivative(value, x) with value = ufunc(x)
+_DERIVATIVES = {
+    np.negative: lambda v, x: -1.0,
+    np.positive: lambda v, x: 1.0,
+    np.absolute: lambda v, x: np.sign(x),
+    np.square: lambda v, x: 2 * x,
+    np.sqrt: _sqrt_derivative,
+    np.cos: lambda v, x: -np.sin(x),
+    np.sin: lambda v, x: np.cos(x),
+    np.tan: lambda v, x: 1 + v * v,
+    np.arctan: lambda v, x: 1 / (1 + x * x),
+    np.log: lambda v, x: 1 / x,
+    np.deg2rad: lambda v, x: np.pi / 180,
+}
+
+# Arithmetic ufuncs map to the (forward, reflected) operator methods of Dual
+_OPERATORS = {
+    np.add: (Dual.__add__, Dual.__radd__),
+    np.subtract: (Dual.__sub__, Dual.__rsub__),
+    np.multiply: (Dual.__mul__, Dual.__rmul__),
+    np.true_divide: (Dual.__truediv__, Dual.__rtruediv__),
+}
+
+_UFUNC_RULES = {
+    np.power: _power,
+    np.maximum: _maximum,
+    np.arctan2: _arctan2,
+}
+
+
+@lru_cache(maxsize=None)
+def _unit_steps(num: int, ndim: int) -> np.ndarray:
+    """np.linspace(0, 1, num) on the sample axis, shaped to broadcast over ndim - 1 design axes and the gradient."""
+    steps = np.linspace(0.0, 1.0, num).reshape((num,) + (1,) * ndim)
+    steps.flags.writeable = False
+    return steps
+
+
+def _linspace(start, stop, num=50, endpoint=True, retstep=False, dtype=None, axis=0):
+    if not endpoint or retstep or dtype is not None or axis != 0:
+        return NotImplemented  # numpy raises TypeError
+    (a, da), (b, db) = _parts(start), _parts(stop)
+    value = np.linspace(a, b, num)
+    t = _unit_steps(num, value.ndim)
+    grad = _combine(None if da is None else (1 - t) * da, None if db is None else t * db)
+    return value if grad is None else Dual(value, _fit(grad, value))
+
+
+def _concatenate(arrays, axis=0, **kwargs):
+    if axis != 0 or kwargs:
+        return NotImplemented
+    n = next(x.grad.shape[-1] for x in arrays if isinstance(x, Dual))
+    values, grads = [], []
+    for x in arrays:
+        value, grad = _parts(x)
+        value = np.asarray(value)
+        values.append(value)
+        grads.append(np.zeros(value.shape + (n,)) if grad is None else grad)
+    return Dual(np.concatenate(values), np.concatenate(grads))
+
+
+def _where(condition, x, y):
+    (xv, dx), (yv, dy) = _parts(x), _parts(y)
+    condition = _parts(condition)[0]
+    value = np.where(condition, xv, yv)
+    grad = _choose(condition, dx, dy)
+    return value if grad is None else Dual(value, _fit(grad, value))
+
+
+_FUNCTION_RULES = {
+    np.linspace: _linspace,
+    np.concatenate: _concatenate,
+    np.where: _where,
+}
+
+
+def value_and_grad(x, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Splits a result into (value, gradient); constants get a zero gradient."""
+    value, grad = _parts(x)
+    value = np.asarray(value, dtype=float)
+    if grad is None:
+        grad = np.zeros(value.shape + (n,))
+    return value, grad
+
+
+def seed(params: Dict[str, Any], wrt: Sequence[str] = SENSITIVITY_PARAMS) -> Dict[str, Any]:
+    """
+    Returns a copy of `params` where the parameters named in `wrt` are Duals.
+
+    Parameters may be scalars or arrays with one entry per design.
+    """
+    unknown = [name for name in wrt if name not in DIFFERENTIABLE_PARAMS]
+    if unknown:
+        raise ValueError(f"Cannot differentiate with respect to {unknown}; choose from {DIFFERENTIABLE_PARAMS}")
+    seeded = dict(params)
+    for i, name in enumerate(wrt):
+        value = params[name]
+        value = float(value) if np.ndim(value) == 0 else np.asarray(value, dtype=float)
+        grad = np.zeros(np.shape(value) + (len(wrt),))
+        grad[..., i] = 1.0
+        seeded[name] = Dual(value, grad)
+    return seeded
+
+
+def _stack(param_sets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Parameters of several designs as arrays over the design axis; segment counts must agree."""
+    stacked = {key: np.array([params[key] for params in param_sets]) for key in PAIR_PARAMS}
+    for key in SEGMENT_PARAMS:
+        stacked[key] = param_sets[0][key]
+    return stacked
+
+
+def _operating_pressure_angle(seeded: Dict[str, Any]):
+    """
+    Operating pressure angle solved on the values. Its gradient follows from
+    inv(alpha_w) = target: d alpha_w = d target / tan(alpha_w)**2.
+    """
+    args = [seeded[key] for key in ('Z', 'z2', 'X', 'x2', 'ALPHA')]
+    alpha_w = gear_math.calculate_operating_pressure_angle(*(_parts(x)[0] for x in args))
+    target_grad = _parts(gear_math.operating_involute(*args))[1]
+    if target_grad is None:
+        return alpha_w
+    return Dual(alpha_w, target_grad / _col(np.tan(alpha_w) ** 2))
+
+
+def _gear_profiles(stacked: Dict[str, Any], wrt: Sequence[str], gears: Sequence[int]):
+    """
+    Profiles of the selected gears of every design in one pass: the gears are stacked
+    on the design axis and each row is seeded with its own gear's parameters.
+    """
+    n, designs = len(wrt), len(stacked['M'])
+    args = []
+    for keys in PROFILE_PARAMS:
+        sources = [keys[gear - 1] for gear in gears]
+        value = np.concatenate([stacked[key] for key in sources])
+        if not any(key in wrt for key in sources):
+            args.append(value)
+            continue
+        grad = np.zeros(value.shape + (n,))
+        for g, key in enumerate(sources):
+            if key in wrt:
+                grad[g * designs:(g + 1) * designs, wrt.index(key)] = 1.0
+        args.append(Dual(value.astype(float), grad))
+    return geometry_generator.generate_tooth_profile(*args, *(stacked[key] for key in SEGMENT_PARAMS))
+
+
+def _split_profiles(profile, n: int, gears: Sequence[int], designs: int, wrt: Sequence[str]) -> List[Dict[int, Any]]:
+    """Per-design {gear: tooth_profile_sensitivities-style dict} from a stacked profile pass."""
+    X_tooth, Y_tooth, Z_calc, P_ANGLE, ALIGN_ANGLE = profile
+    X_value, dX = value_and_grad(X_tooth, n)
+    Y_value, dY = value_and_grad(Y_tooth, n)
+    split = [{} for _ in range(designs)]
+    for g, gear in enumerate(gears):
+        for d in range(designs):
+            j = g * designs + d
+            split[d][gear] = {
+                'wrt': tuple(wrt),
+                'profile': (X_value[:, j], Y_value[:, j], int(Z_calc[j]), float(P_ANGLE[j]), float(ALIGN_ANGLE[j])),
+                'dX': dX[:, j], 'dY': dY[:, j],
+            }
+    return split
+
+
+def _batch(param_sets: List[Dict[str, Any]], wrt: Sequence[str], gears: Sequence[int], analysis: bool):
+    """Evaluates designs with equal segment counts in one vectorized pass."""
+    n = len(wrt)
+    stacked = _stack(param_sets)
+    result: Dict[str, Any] = {}
+    if analysis:
+        seeded = seed(stacked, wrt)
+        contact_ratio, center_dist = gear_math.calculate_contact_ratio(
+            seeded['M'], seeded['Z'], seeded['z2'], seeded['X'], seeded['x2'], seeded['ALPHA'], seeded['A'],
+            _operating_pressure_angle(seeded)
+        )
+        shape = (len(param_sets),)
+        for key, x in (('contact_ratio', contact_ratio), ('center_distance', center_dist)):
+            value, grad = value_and_grad(x, n)
+            if value.shape != shape:  # A constant 0 when no design has a valid contact ratio
+                value, grad = np.broadcast_to(value, shape), np.broadcast_to(grad, shape + (n,))
+            result[key] = (value, grad)
+    if gears:
+        result['profiles'] = _split_profiles(_gear_profiles(stacked, wrt, gears), n, gears, len(param_sets), wrt)
+    return result
+
+
+def tooth_profile_sensitivities(params: Dict[str, Any], gear: int = 1,
+                                wrt: Sequence[str] = SENSITIVITY_PARAMS) -> Dict[str, Any]:
+    """
+    Tooth profile of gear 1 or 2 with its Jacobian.
+
+    Returns:
+        dict: 'profile' (X_tooth, Y_tooth, Z, P_ANGLE, ALIGN_ANGLE) as floats, and
+        'dX', 'dY' of shape (points, len(wrt)) with columns in `wrt` order.
+    """
+    return _batch([params], wrt, (gear,), analysis=False)['profiles'][0][gear]
+
+
+def pair_sensitivities(params: Dict[str, Any], wrt: Sequence[str] = SENSITIVITY_PARAMS,
+                       profiles: bool = True) -> Dict[str, Any]:
+    """
+    Contact ratio, center distance and (optionally) both tooth profiles with their
+    gradients, from a single dual evaluation (both gears share one profile pass).
+
+    Returns:
+        dict with 'wrt', 'contact_ratio' and 'center_distance' as (value, gradient)
+        pairs, and 'gear1'/'gear2' as returned by tooth_profile_sensitivities.
+    """
+    batch = _batch([params], wrt, (1, 2) if profiles else (), analysis=True)
+    result = {'wrt': tuple(wrt)}
+    for key in ('contact_ratio', 'center_distance'):
+        value, grad = batch[key]
+        result[key] = (value[0], grad[0])
+    if profiles:
+        for gear in (1, 2):
+            result[f'gear{gear}'] = batch['profiles'][0][gear]
+    return result
+
+
+def batch_pair_sensitivities(param_sets: Iterable[Dict[str, Any]], wrt: Sequence[str] = SENSITIVITY_PARAMS,
+                             profiles: bool = False) -> Dict[str, Any]:
+    """
+    pair_sensitivities over many designs, evaluated as one vectorized pass (one per
+    distinct set of segment counts when profiles are requested).
+
+    Returns:
+        dict: 'contact_ratio' and 'center_distance' values of shape (designs,),
+        their gradients 'd_contact_ratio' and 'd_center_distance' of shape
+        (designs, len(wrt)), and 'profiles' (list of gear1/gear2 dicts) if requested.
+    """
+    param_sets = list(param_sets)
+    n = len(wrt)
+    batch: Dict[str, Any] = {'wrt': tuple(wrt)}
+    for key in ('contact_ratio', 'center_distance'):
+        batch[key] = np.zeros(len(param_sets))
+        batch['d_' + key] = np.zeros((len(param_sets), n))
+    if profiles:
+        batch['profiles'] = [None] * len(param_sets)
+    # Profiles of equal segment counts have equal lengths and share a pass
+    groups: Dict[tuple, List[int]] = {}
+    for index, params in enumerate(param_sets):
+        key = tuple(params[name] for name in SEGMENT_PARAMS) if profiles else ()
+        groups.setdefault(key, []).append(index)
+    for indices in groups.values():
+        result = _batch([param_sets[i] for i in indices], wrt, (1, 2) if profiles else (), analysis=True)
+        for key in ('contact_ratio', 'center_distance'):
+            batch[key][indices], batch['d_' + key][indices] = result[key]
+        if profiles:
+            for i, gears in zip(indices, result['profiles']):
+                batch['profiles'][i] = {'gear1': gears[1], 'gear2': gears[2]}
+    return batch
@@ -30,4 +30,26 @@ def create_circular_pattern(X_tooth, Y_tooth, Z, P_ANGLE, ALIGN_ANGLE):
         all_X.append(X_final)
         all_Y.append(Y_final)
 
-    return all_X, all_Y
\ No newline at end of file
+    return all_X, all_Y
+
+def pattern_gear_pair(gear1_data, gear2_data, center_dist, x_offset=0.0, y_offset=0.0):
+    """
+    Patterns both gears of a pair and moves them to their meshing positions.
+
+    Gear 1 is centered at (x_offset, y_offset); gear 2 is turned by pi + pi/Z2 so a
+    tooth space faces gear 1 and is centered center_dist further along X.
+    Returns ((all_X1, all_Y1), (all_X2, all_Y2)) with one array pair per tooth.
+    """
+    X_tooth1, Y_tooth1, Z1, P_ANGLE1, ALIGN_ANGLE1 = gear1_data
+    all_X1, all_Y1 = create_circular_pattern(X_tooth1, Y_tooth1, Z1, P_ANGLE1, ALIGN_ANGLE1)
+    placed1 = [translate(X, Y, x_offset, y_offset) for X, Y in zip(all_X1, all_Y1)]
+
+    X_tooth2, Y_tooth2, Z2, P_ANGLE2, ALIGN_ANGLE2 = gear2_data
+    initial_rotation2 = np.pi + (np.pi / Z2)
+    all_X2, all_Y2 = create_circular_pattern(X_tooth2, Y_tooth2, Z2, P_ANGLE2, ALIGN_ANGLE2 + initial_rotation2)
+    placed2 = [translate(X, Y, x_offset + center_dist, y_offset) for X, Y in zip(all_X2, all_Y2)]
+
+    return (
+        ([X for X, _ in placed1], [Y for _, Y in placed1]),
+        ([X for X, _ in placed2], [Y for _, Y in placed2]),
+    )
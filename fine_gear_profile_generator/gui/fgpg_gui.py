@@ -10,8 +10,9 @@ except ImportError:
 
 # Import the refactored modules
 from ..core import gear_core
-from ..io import dxf_exporter, image_exporter
+from ..io import export_pipeline
 from ..utils import config_manager
+from .preview_canvas import GearPreviewCanvas
 
 SPEC_FIELDS = [
     ("module_m", "Module, m", "[mm], (>0)"),
@@ -51,9 +52,8 @@ class GearApp(tk.Tk):
         self.geometry(window_config.get('geometry', "950x700"))
 
         self.vars = {}
-        self.current_image_path = self.defaults.get('current_image_path', "Result1.png")
+        self.current_image_path = self.defaults.get('current_image_path', export_pipeline.get_exporter('png').filename)
         self.logo_image = None
-        self.result_image = None
 
         main_frame = ttk.Frame(self, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -125,6 +125,9 @@ class GearApp(tk.Tk):
         self.image_label.grid(row=1, column=0, pady=10, sticky="nsew")
         parent.rowconfigure(1, weight=1)
 
+        # Vector preview (wheel: zoom, drag: pan, double-click: fit); shown after the first run
+        self.preview_canvas = GearPreviewCanvas(parent, width=500, height=500)
+
         self.status_var = tk.StringVar(value="Welcome to the refactored Fine Gear Profile Generator!")
         ttk.Label(parent, textvariable=self.status_var, wraplength=500).grid(row=2, column=0, sticky="ew", pady=5)
 
@@ -190,25 +193,10 @@ class GearApp(tk.Tk):
             gear1 = result['gear1']
             gear2 = result['gear2']
 
-            image_exporter.export_gear_pair_to_image(
-                working_dir,
-                gear1['profile'],
-                gear2['profile'],
-                analysis['center_distance'],
-                params['M'],
-                params['Z'],
-                params['z2'],
-                params['X_0'],
-                params['Y_0']
-            )
-
-            dxf_exporter.export_gear_pair_to_dxf(
-                working_dir,
-                gear1['profile'],
-                gear2['profile'],
-                analysis['center_distance'],
-                params['X_0'],
-                params['Y_0']
+            job = export_pipeline.build_export_job(result, params)
+            export_pipeline.run_exporters(
+                ['png', 'dxf'], working_dir, result, params,
+                filenames={'png': self.current_image_path}, job=job
             )
 
             self.vars['contact_ratio'].set(f"{analysis['contact_ratio']:.4f}")
@@ -216,30 +204,18 @@ class GearApp(tk.Tk):
             self.status_var.set(
                 f"Run: OK. G1 Undercut: {gear1['undercut_status']}. G2 Undercut: {gear2['undercut_status']}"
             )
-            self.display_result_image()
+            self.display_preview(job['patterned'])
 
         except Exception as e:
             messagebox.showerror("Calculation Error", f"An error occurred: {e}")
             self.status_var.set(f"Run: Failed. {e}")
 
-    def display_result_image(self):
-        if not PIL_AVAILABLE:
-            self.status_var.set("Run: OK. Install Pillow (pip install Pillow) for image preview.")
-            return
-        try:
-            working_dir = self.vars['working_directory'].get()
-            img_path = os.path.join(working_dir, self.current_image_path)
-            if os.path.exists(img_path):
-                img = Image.open(img_path)
-                img.thumbnail((500, 500))
-                self.result_image = ImageTk.PhotoImage(img)
-                self.image_label.config(image=self.result_image)
-            else:
-                # If image not found, revert to logo
-                self.image_label.config(image=self.logo_image)
-                self.status_var.set(f"Image not found: {img_path}")
-        except Exception as e:
-            self.status_var.set(f"Error displaying image: {e}")
+    def display_preview(self, patterned):
+        """Replaces the thumbnail with the zoomable vector preview of the gear pair."""
+        self.image_label.grid_remove()
+        self.preview_canvas.grid(row=1, column=0, pady=10, sticky="nsew")
+        self.preview_canvas.update_idletasks()
+        self.preview_canvas.set_gear_pair(patterned)
 
     def save_params_to_file(self):
         working_dir = self.vars['working_directory'].get()
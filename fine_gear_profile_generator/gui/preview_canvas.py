@@ -0,0 +1,201 @@
+"""
+Zoomable vector preview of a gear pair with level-of-detail rendering.
+
+Each gear keeps an outline pyramid: level 0 is the full-resolution patterned
+outline, and every further level keeps every other point of each tooth. When
+drawing, the coarsest level whose point spacing is still below a couple of
+pixels is chosen, teeth outside the view are culled by their bounding boxes,
+and consecutive visible teeth are drawn as one canvas line. Zooming into a
+single tooth of a 1000-tooth ring gear therefore draws one or two teeth at full
+detail, and the whole gear is drawn with only a few points per tooth.
+"""
+
+import tkinter as tk
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Target distance between drawn points, in pixels
+TARGET_POINT_SPACING_PX = 2.0
+MIN_POINTS_PER_TOOTH = 4
+
+
+class OutlinePyramid:
+    """
+    Multi-resolution outline of one patterned gear.
+
+    Args:
+        all_X, all_Y: Per-tooth coordinate arrays, in order around the gear
+            (as returned by transformations.pattern_gear_pair).
+    """
+
+    def __init__(self, all_X: Sequence[np.ndarray], all_Y: Sequence[np.ndarray]):
+        teeth = [np.column_stack((X, Y)) for X, Y in zip(all_X, all_Y)]
+        self.tooth_count = len(teeth)
+        mins = np.array([t.min(axis=0) for t in teeth])
+        maxs = np.array([t.max(axis=0) for t in teeth])
+        # (Z, 4) array of x_min, y_min, x_max, y_max per tooth
+        self.tooth_bounds = np.hstack((mins, maxs))
+        self.bounds = (mins[:, 0].min(), mins[:, 1].min(), maxs[:, 0].max(), maxs[:, 1].max())
+
+        self.levels: List[Tuple[np.ndarray, np.ndarray]] = []
+        self.spacing: List[float] = []
+        level_teeth = teeth
+        while True:
+            self.levels.append(self._concatenate(level_teeth))
+            points = self.levels[-1][0]
+            self.spacing.append(float(np.mean(np.hypot(*np.diff(points, axis=0).T))) if len(points) > 1 else 0.0)
+            if len(level_teeth[0]) <= MIN_POINTS_PER_TOOTH:
+                break
+            # Keep every other point, always keeping each tooth's last point so the outline stays joined
+            level_teeth = [np.vstack((t[:-1:2], t[-1:])) for t in level_teeth]
+
+    @staticmethod
+    def _concatenate(teeth: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        offsets = np.zeros(len(teeth) + 1, dtype=int)
+        offsets[1:] = np.cumsum([len(t) for t in teeth])
+        return np.vstack(teeth), offsets
+
+    def level_for_scale(self, pixels_per_unit: float) -> int:
+        """Returns the coarsest level whose point spacing stays below TARGET_POINT_SPACING_PX."""
+        for level in range(len(self.levels) - 1, -1, -1):
+            if self.spacing[level] * pixels_per_unit <= TARGET_POINT_SPACING_PX:
+                return level
+        return 0
+
+    def visible_teeth(self, view: Tuple[float, float, float, float]) -> np.ndarray:
+        """Boolean mask of teeth whose bounding box intersects view = (x_min, y_min, x_max, y_max)."""
+        b = self.tooth_bounds
+        return (b[:, 2] >= view[0]) & (b[:, 0] <= view[2]) & (b[:, 3] >= view[1]) & (b[:, 1] <= view[3])
+
+    def select(self, view: Tuple[float, float, float, float], pixels_per_unit: float) -> Tuple[int, List[np.ndarray]]:
+        """
+        Returns (level, polylines) to draw for the view.
+
+        Each polyline covers a run of consecutive visible teeth; a run spanning the
+        whole gear is closed back to its first point.
+        """
+        level = self.level_for_scale(pixels_per_unit)
+        points, offsets = self.levels[level]
+        visible = self.visible_teeth(view)
+        if not visible.any():
+            return level, []
+        if visible.all():
+            return level, [np.vstack((points, points[:1]))]
+
+        # Start/end indices of runs of visible teeth
+        edges = np.diff(np.concatenate(([0], visible.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        # A run touching both the last and the first tooth wraps around the gear
+        if len(starts) > 1 and visible[0] and visible[-1]:
+            wrapped = np.vstack((points[offsets[starts[-1]]:], points[:offsets[ends[0]]]))
+            runs = [wrapped] + [points[offsets[s]:offsets[e]] for s, e in zip(starts[1:-1], ends[1:-1])]
+            return level, runs
+        return level, [points[offsets[s]:offsets[e]] for s, e in zip(starts, ends)]
+
+
+class GearPreviewCanvas(tk.Canvas):
+    """
+    A canvas showing a gear pair with mouse-wheel zoom (around the cursor),
+    drag-to-pan, and double-click to fit.
+    """
+
+    COLORS = ('blue', 'red')
+
+    def __init__(self, parent, **kwargs):
+        kwargs.setdefault('background', 'white')
+        kwargs.setdefault('highlightthickness', 0)
+        super().__init__(parent, **kwargs)
+        self.pyramids: List[OutlinePyramid] = []
+        self.scale = 1.0           # pixels per world unit
+        self.center = (0.0, 0.0)   # world point at the canvas center
+        self._drag_start: Optional[Tuple[int, int]] = None
+        self._redraw_pending = False
+        self.last_draw_stats = {'level': None, 'points': 0, 'items': 0}
+
+        self.bind('<Configure>', lambda e: self.request_redraw())
+        self.bind('<ButtonPress-1>', self._on_press)
+        self.bind('<B1-Motion>', self._on_drag)
+        self.bind('<Double-Button-1>', lambda e: self.fit())
+        self.bind('<MouseWheel>', lambda e: self.zoom(1.25 if e.delta > 0 else 0.8, e.x, e.y))
+        self.bind('<Button-4>', lambda e: self.zoom(1.25, e.x, e.y))
+        self.bind('<Button-5>', lambda e: self.zoom(0.8, e.x, e.y))
+
+    def set_gear_pair(self, patterned) -> None:
+        """Shows a patterned gear pair ((all_X1, all_Y1), (all_X2, all_Y2)) and fits it to the view."""
+        self.pyramids = [OutlinePyramid(all_X, all_Y) for all_X, all_Y in patterned]
+        self.fit()
+
+    def _size(self) -> Tuple[int, int]:
+        return max(self.winfo_width(), 1), max(self.winfo_height(), 1)
+
+    def fit(self) -> None:
+        if not self.pyramids:
+            return
+        bounds = np.array([p.bounds for p in self.pyramids])
+        x_min, y_min = bounds[:, 0].min(), bounds[:, 1].min()
+        x_max, y_max = bounds[:, 2].max(), bounds[:, 3].max()
+        width, height = self._size()
+        self.center = ((x_min + x_max) / 2, (y_min + y_max) / 2)
+        self.scale = 0.95 * min(width / max(x_max - x_min, 1e-9), height / max(y_max - y_min, 1e-9))
+        self.request_redraw()
+
+    def world_to_canvas(self, points: np.ndarray) -> np.ndarray:
+        width, height = self._size()
+        px = (points[:, 0] - self.center[0]) * self.scale + width / 2
+        py = height / 2 - (points[:, 1] - self.center[1]) * self.scale
+        return np.column_stack((px, py))
+
+    def canvas_to_world(self, x: float, y: float) -> Tuple[float, float]:
+        width, height = self._size()
+        return (self.center[0] + (x - width / 2) / self.scale,
+                self.center[1] - (y - height / 2) / self.scale)
+
+    def view_bounds(self) -> Tuple[float, float, float, float]:
+        width, height = self._size()
+        x0, y1 = self.canvas_to_world(0, 0)
+        x1, y0 = self.canvas_to_world(width, height)
+        return x0, y0, x1, y1
+
+    def zoom(self, factor: float, x: float, y: float) -> None:
+        """Zooms by `factor` keeping the world point under canvas position (x, y) fixed."""
+        wx, wy = self.canvas_to_world(x, y)
+        self.scale *= factor
+        nx, ny = self.canvas_to_world(x, y)
+        self.center = (self.center[0] + wx - nx, self.center[1] + wy - ny)
+        self.request_redraw()
+
+    def _on_press(self, event) -> None:
+        self._drag_start = (event.x, event.y)
+
+    def _on_drag(self, event) -> None:
+        if self._drag_start is None:
+            return
+        dx, dy = event.x - self._drag_start[0], event.y - self._drag_start[1]
+        self._drag_start = (event.x, event.y)
+        self.center = (self.center[0] - dx / self.scale, self.center[1] + dy / self.scale)
+        self.request_redraw()
+
+    def request_redraw(self) -> None:
+        """Coalesces bursts of zoom/pan events into a single redraw."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self.redraw)
+
+    def redraw(self) -> None:
+        self._redraw_pending = False
+        self.delete('gear')
+        view = self.view_bounds()
+        stats = {'level': [], 'points': 0, 'items': 0}
+        for pyramid, color in zip(self.pyramids, self.COLORS):
+            level, polylines = pyramid.select(view, self.scale)
+            stats['level'].append(level)
+            for polyline in polylines:
+                if len(polyline) < 2:
+                    continue
+                coords = self.world_to_canvas(polyline).ravel().tolist()
+                self.create_line(coords, fill=color, width=1, tags='gear')
+                stats['points'] += len(polyline)
+                stats['items'] += 1
+        self.last_draw_stats = stats
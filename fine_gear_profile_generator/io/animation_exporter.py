@@ -0,0 +1,195 @@
+"""
+Meshing animation exporter.
+
+Gear 1 turns by theta and gear 2 by -theta * Z1 / Z2 about the placement the other
+exporters use (gear 2 turned by pi + pi/Z2 and offset by the center distance). A
+negative Z2 (internal gear) makes the ring turn in the same direction as the pinion.
+
+The patterned outlines are sent once to every worker process (pool initializer)
+and each worker rasterizes its frames independently with Pillow. Frames are
+written as an animated GIF, an APNG, or a directory of numbered PNG frames that
+can be encoded to MP4 with e.g. `ffmpeg -i frame_%04d.png out.mp4`.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from PIL import Image, ImageDraw
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from ..utils import profiler
+
+ANIMATION_FORMATS = ('gif', 'apng', 'frames')
+DEFAULT_FRAMES = 360
+DEFAULT_WIDTH = 640
+DEFAULT_FPS = 30
+
+# The exporter runs on a thread of the export pipeline's pool, and forking a
+# multi-threaded process can deadlock the child; start workers from a clean process
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Palette indices: background, gear 1, gear 2
+_PALETTE = [255, 255, 255, 0, 0, 255, 255, 0, 0] + [0, 0, 0] * 253
+
+_scene: Optional[Dict[str, Any]] = None
+
+
+def _closed_outline(all_X: List[np.ndarray], all_Y: List[np.ndarray], center: tuple) -> np.ndarray:
+    """Joins the patterned teeth into one closed (N, 2) outline relative to the gear center."""
+    X = np.concatenate(all_X) - center[0]
+    Y = np.concatenate(all_Y) - center[1]
+    outline = np.column_stack((X, Y))
+    return np.vstack((outline, outline[:1]))
+
+
+def build_scene(job: Dict[str, Any], frames: int = DEFAULT_FRAMES, width: int = DEFAULT_WIDTH,
+                turns: float = 1.0, margin: int = 10) -> Dict[str, Any]:
+    """
+    Prepares everything a worker needs to draw any frame.
+
+    Args:
+        job: Export job from export_pipeline.build_export_job.
+        frames: Number of frames.
+        width: Image width in pixels; the height follows the aspect ratio of the pair.
+        turns: Revolutions of gear 1 over the whole animation. Any whole number
+            of gear 1 tooth pitches loops seamlessly.
+        margin: Border in pixels.
+
+    Raises:
+        ValueError: If frames is not a positive integer or turns is not positive.
+    """
+    if int(frames) != frames or frames < 1:
+        raise ValueError(f"frames must be a positive integer, got {frames}")
+    if not turns > 0:
+        raise ValueError(f"turns must be positive, got {turns}")
+    params = job['params']
+    x0, y0 = params.get('X_0', 0.0), params.get('Y_0', 0.0)
+    center1 = (x0, y0)
+    center2 = (x0 + job['center_distance'], y0)
+    (all_X1, all_Y1), (all_X2, all_Y2) = job['patterned']
+    outline1 = _closed_outline(all_X1, all_Y1, center1)
+    outline2 = _closed_outline(all_X2, all_Y2, center2)
+
+    # Bounding box of both gears over a full turn (circles of their outer radii)
+    r1 = float(np.max(np.hypot(outline1[:, 0], outline1[:, 1])))
+    r2 = float(np.max(np.hypot(outline2[:, 0], outline2[:, 1])))
+    x_min = min(center1[0] - r1, center2[0] - r2)
+    x_max = max(center1[0] + r1, center2[0] + r2)
+    y_min = min(center1[1] - r1, center2[1] - r2)
+    y_max = max(center1[1] + r1, center2[1] + r2)
+    scale = (width - 2 * margin) / (x_max - x_min)
+    height = int(np.ceil((y_max - y_min) * scale)) + 2 * margin
+
+    return {
+        'outlines': (outline1, outline2),
+        'centers': (center1, center2),
+        'ratio': -params['Z'] / params['z2'],
+        'step': 2 * np.pi * turns / frames,
+        'frames': frames,
+        'size': (width, height),
+        'scale': scale,
+        'origin': (x_min, y_max, margin),
+    }
+
+
+def render_frame(scene: Dict[str, Any], index: int) -> 'Image.Image':
+    """Rasterizes frame `index` as a palette image."""
+    width, height = scene['size']
+    scale = scene['scale']
+    x_min, y_max, margin = scene['origin']
+    theta = scene['step'] * index
+
+    image = Image.new('P', (width, height), 0)
+    image.putpalette(_PALETTE)
+    draw = ImageDraw.Draw(image)
+    for color, outline, center, angle in zip((1, 2), scene['outlines'], scene['centers'], (theta, theta * scene['ratio'])):
+        c, s = np.cos(angle), np.sin(angle)
+        X = c * outline[:, 0] - s * outline[:, 1] + center[0]
+        Y = s * outline[:, 0] + c * outline[:, 1] + center[1]
+        # Image rows grow downwards, so Y is flipped
+        pixels = np.column_stack(((X - x_min) * scale + margin, (y_max - Y) * scale + margin))
+        draw.line(pixels.ravel().tolist(), fill=color, width=1)
+    return image
+
+
+def _init_worker(scene: Dict[str, Any]) -> None:
+    global _scene
+    _scene = scene
+
+
+def _render_batch(indices: List[int], frame_dir: Optional[str] = None) -> List[bytes]:
+    """Worker entry point: renders frames and returns their raw palette bytes, or saves them."""
+    images = [render_frame(_scene, i) for i in indices]
+    if frame_dir is not None:
+        for i, image in zip(indices, images):
+            image.save(os.path.join(frame_dir, f'frame_{i:04d}.png'))
+        return []
+    return [image.tobytes() for image in images]
+
+
+def _batches(frames: int, workers: int) -> List[List[int]]:
+    # A few batches per worker balances load without per-frame IPC overhead.
+    count = max(1, min(frames, workers * 4))
+    return [list(chunk) for chunk in np.array_split(np.arange(frames), count) if len(chunk)]
+
+
+def write_gear_pair_animation(output_path: str, job: Dict[str, Any], fmt: str = 'gif',
+                              frames: int = DEFAULT_FRAMES, fps: int = DEFAULT_FPS,
+                              width: int = DEFAULT_WIDTH, turns: float = 1.0,
+                              max_workers: Optional[int] = None) -> None:
+    """
+    Renders the meshing animation in a process pool and writes it to `output_path`.
+
+    For fmt='frames', `output_path` is a directory that receives frame_0000.png, ...
+    """
+    if not PIL_AVAILABLE:
+        raise RuntimeError("Pillow is required for animation export (pip install Pillow).")
+    if fmt not in ANIMATION_FORMATS:
+        raise ValueError(f"Unknown animation format '{fmt}', expected one of {ANIMATION_FORMATS}")
+
+    with profiler.span('animation.build_scene'):
+        scene = build_scene(job, frames, width, turns)
+    workers = max_workers or os.cpu_count() or 1
+    frame_dir = None
+    if fmt == 'frames':
+        frame_dir = output_path
+        os.makedirs(frame_dir, exist_ok=True)
+
+    with profiler.span('animation.render', frames=frames, workers=workers):
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(_START_METHOD),
+                                 initializer=_init_worker, initargs=(scene,)) as pool:
+            batches = _batches(frames, workers)
+            results = pool.map(_render_batch, batches, [frame_dir] * len(batches))
+            raw_frames = [raw for batch in results for raw in batch]
+    if frame_dir is not None:
+        if profiler.is_enabled():
+            profiler.count('bytes_written', sum(os.path.getsize(os.path.join(frame_dir, f'frame_{i:04d}.png'))
+                                                for i in range(frames)))
+        return
+
+    with profiler.span('animation.encode', format=fmt):
+        images = []
+        for raw in raw_frames:
+            image = Image.frombytes('P', scene['size'], raw)
+            image.putpalette(_PALETTE)
+            images.append(image)
+        duration = int(round(1000 / fps))
+        if fmt == 'gif':
+            # The frames already share a 3-color palette; palette optimization would
+            # only re-scan every frame and dominates the encode time.
+            images[0].save(output_path, format='GIF', save_all=True, append_images=images[1:],
+                           duration=duration, loop=0, optimize=False)
+        else:
+            images[0].save(output_path, format='PNG', save_all=True, append_images=images[1:],
+                           duration=duration, loop=0)
+    if profiler.is_enabled() and isinstance(output_path, str):
+        profiler.count('bytes_written', os.path.getsize(output_path))
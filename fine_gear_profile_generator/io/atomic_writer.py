@@ -0,0 +1,59 @@
+import os
+import secrets
+from contextlib import contextmanager
+
+def _create_temp_file(directory, stem, ext):
+    """
+    Creates an empty, uniquely named file next to the target and returns its path.
+
+    Unlike tempfile.mkstemp (always 0600) the file is created with mode 0666, which
+    the kernel filters through the umask and default ACLs exactly as for a plain
+    open(), without touching the process-wide umask.
+    """
+    while True:
+        tmp_path = os.path.join(directory, f".{stem}.{secrets.token_hex(4)}{ext}")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            continue
+        os.close(fd)
+        return tmp_path
+
+def _fsync_path(path, flags=os.O_RDONLY):
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+@contextmanager
+def atomic_output_path(output_path):
+    """
+    Yields a temporary path next to `output_path` and renames it into place on success.
+
+    The temporary file keeps the final extension so writers that infer the format
+    from the name (matplotlib, ezdxf) behave as usual. Its data is flushed to disk
+    before the rename and the rename itself is flushed with the directory, so after
+    a crash `output_path` holds either the old or the complete new file. If the
+    block raises, the temporary file is removed and any existing file at
+    `output_path` is untouched.
+
+    Args:
+        output_path (str): The final location of the file.
+    """
+    directory, filename = os.path.split(os.path.abspath(output_path))
+    stem, ext = os.path.splitext(filename)
+    tmp_path = _create_temp_file(directory, stem, ext)
+    try:
+        yield tmp_path
+        # Windows only fsyncs handles opened for writing
+        _fsync_path(tmp_path, os.O_RDWR)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    # Directories cannot be opened (or fsynced) on Windows, where the rename is
+    # journaled by the file system instead.
+    if hasattr(os, 'O_DIRECTORY'):
+        _fsync_path(directory, os.O_RDONLY | os.O_DIRECTORY)
@@ -0,0 +1,439 @@
+"""
+Indexed SQLite design library for gear parameter sets.
+
+Each design stores typed calculation parameters (the same keys gear_core uses),
+the computed analysis and, optionally, the tooth profiles as a compressed NumPy
+blob. Indexes on module, tooth counts and profile shifts keep lookups fast across
+hundreds of thousands of designs. Legacy per-directory Inputs.dat files can be
+bulk imported.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+# Calculation parameter -> SQLite column type
+PARAM_COLUMNS = {
+    'M': 'REAL', 'Z': 'INTEGER', 'z2': 'INTEGER', 'ALPHA': 'REAL',
+    'X': 'REAL', 'x2': 'REAL', 'B': 'REAL', 'A': 'REAL', 'D': 'REAL',
+    'C': 'REAL', 'E': 'REAL', 'X_0': 'REAL', 'Y_0': 'REAL',
+    'SEG_INVOLUTE': 'INTEGER', 'SEG_EDGE_R': 'INTEGER', 'SEG_ROOT_R': 'INTEGER',
+    'SEG_OUTER': 'INTEGER', 'SEG_ROOT': 'INTEGER',
+}
+
+ANALYSIS_COLUMNS = {
+    'contact_ratio': 'REAL', 'center_distance': 'REAL',
+    'gear1_undercut_status': 'TEXT', 'gear2_undercut_status': 'TEXT',
+}
+
+# GUI field key (as stored in Inputs.dat) -> calculation parameter
+UI_KEY_TO_PARAM = {
+    'module_m': 'M', 'teeth_number_z': 'Z', 'pressure_angle_alpha': 'ALPHA',
+    'offset_factor_x': 'X', 'backlash_factor_b': 'B', 'addendum_factor_a': 'A',
+    'dedendum_factor_d': 'D', 'hob_edge_radius_c': 'C', 'tooth_edge_radius_e': 'E',
+    'teeth_number_z2': 'z2', 'offset_factor_x2': 'x2', 'x_0': 'X_0', 'y_0': 'Y_0',
+    'seg_involute': 'SEG_INVOLUTE', 'seg_edge_r': 'SEG_EDGE_R', 'seg_root_r': 'SEG_ROOT_R',
+    'seg_outer': 'SEG_OUTER', 'seg_root': 'SEG_ROOT',
+}
+
+LEGACY_FILENAME = 'Inputs.dat'
+
+_COLUMNS = list(PARAM_COLUMNS) + list(ANALYSIS_COLUMNS)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS designs (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    created REAL NOT NULL,
+    {', '.join(f'"{c}" {t}' for c, t in {**PARAM_COLUMNS, **ANALYSIS_COLUMNS}.items())}
+);
+CREATE TABLE IF NOT EXISTS geometry (
+    design_id INTEGER PRIMARY KEY REFERENCES designs(id) ON DELETE CASCADE,
+    encoding TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_designs_module ON designs("M");
+CREATE INDEX IF NOT EXISTS idx_designs_teeth ON designs("Z", "z2");
+CREATE INDEX IF NOT EXISTS idx_designs_shift ON designs("X", "x2");
+CREATE INDEX IF NOT EXISTS idx_designs_mate_teeth ON designs("z2");
+CREATE INDEX IF NOT EXISTS idx_designs_mate_shift ON designs("x2");
+CREATE INDEX IF NOT EXISTS idx_designs_name ON designs(name, created);
+"""
+
+Range = Union[float, Tuple[Optional[float], Optional[float]]]
+
+
+def coerce_params(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts parameter values to the column types, ignoring unknown keys.
+
+    Raises:
+        ValueError: If an integer parameter has a fractional value (e.g. Z=18.7).
+    """
+    params = {}
+    for key, column_type in PARAM_COLUMNS.items():
+        if key not in values or values[key] in (None, ''):
+            continue
+        value = float(values[key])
+        if column_type == 'INTEGER':
+            if not value.is_integer():
+                raise ValueError(f"{key} must be an integer, got {values[key]!r}")
+            value = int(value)
+        params[key] = value
+    return params
+
+
+def _parse_number(value: Any) -> Optional[float]:
+    """Parses legacy display strings such as '30.6954 mm' or '--'."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().split(' ')[0]
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def params_from_ui_values(values: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Converts stringly-typed GUI/Inputs.dat values into typed (params, analysis).
+    """
+    params = coerce_params({UI_KEY_TO_PARAM[k]: v for k, v in values.items() if k in UI_KEY_TO_PARAM})
+    analysis = {}
+    for key in ('contact_ratio', 'center_distance'):
+        number = _parse_number(values.get(key))
+        if number is not None:
+            analysis[key] = number
+    return params, analysis
+
+
+def ui_values_from_params(params: Dict[str, Any], analysis: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """Formats typed values for the GUI fields (the inverse of params_from_ui_values)."""
+    values = {ui_key: str(params[key]) for ui_key, key in UI_KEY_TO_PARAM.items() if params.get(key) is not None}
+    analysis = analysis or {}
+    if analysis.get('contact_ratio') is not None:
+        values['contact_ratio'] = f"{analysis['contact_ratio']:.4f}"
+    if analysis.get('center_distance') is not None:
+        values['center_distance'] = f"{analysis['center_distance']:.4f} mm"
+    return values
+
+
+def encode_geometry(gear1_profile: Sequence[Any], gear2_profile: Sequence[Any], compress: bool = True) -> bytes:
+    """Packs two (X_tooth, Y_tooth, Z, P_ANGLE, ALIGN_ANGLE) profiles into an .npz blob."""
+    arrays = {}
+    for prefix, (X_tooth, Y_tooth, Z, P_ANGLE, ALIGN_ANGLE) in (('g1', gear1_profile), ('g2', gear2_profile)):
+        arrays[f'{prefix}_x'] = np.asarray(X_tooth, dtype=float)
+        arrays[f'{prefix}_y'] = np.asarray(Y_tooth, dtype=float)
+        arrays[f'{prefix}_meta'] = np.array([Z, P_ANGLE, ALIGN_ANGLE], dtype=float)
+    buffer = io.BytesIO()
+    (np.savez_compressed if compress else np.savez)(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def decode_geometry(blob: bytes) -> Tuple[tuple, tuple]:
+    """Unpacks a blob written by encode_geometry into the two tooth profiles."""
+    with np.load(io.BytesIO(blob)) as data:
+        profiles = []
+        for prefix in ('g1', 'g2'):
+            Z, P_ANGLE, ALIGN_ANGLE = data[f'{prefix}_meta']
+            profiles.append((data[f'{prefix}_x'], data[f'{prefix}_y'], int(Z), float(P_ANGLE), float(ALIGN_ANGLE)))
+    return profiles[0], profiles[1]
+
+
+def read_inputs_dat(path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Reads a legacy Inputs.dat file into typed (params, analysis)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return params_from_ui_values(json.load(f))
+
+
+def _iter_inputs_dat(paths: Iterable[str]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                if LEGACY_FILENAME in files:
+                    yield os.path.join(root, LEGACY_FILENAME)
+        else:
+            yield path
+
+
+class DesignLibrary:
+    """
+    A design library stored in a single SQLite file.
+
+    Args:
+        path (str): Database file, or ':memory:' for a temporary library.
+    """
+
+    def __init__(self, path: str):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        if path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode = WAL')
+        with self.conn:
+            self.conn.executescript(_SCHEMA)
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # --- Writing ---
+
+    def _row_values(self, params: Dict[str, Any], analysis: Optional[Dict[str, Any]],
+                    name: Optional[str], created: Optional[float]) -> list:
+        typed = coerce_params(params)
+        analysis = analysis or {}
+        values = [name, created if created is not None else time.time()]
+        values.extend(typed.get(key) for key in PARAM_COLUMNS)
+        for key, column_type in ANALYSIS_COLUMNS.items():
+            value = analysis.get(key)
+            values.append(float(value) if value is not None and column_type == 'REAL' else value)
+        return values
+
+    def _insert_sql(self) -> str:
+        columns = ', '.join(['name', 'created'] + [f'"{c}"' for c in _COLUMNS])
+        placeholders = ', '.join('?' * (len(_COLUMNS) + 2))
+        return f'INSERT INTO designs ({columns}) VALUES ({placeholders})'
+
+    def add_design(self, params: Dict[str, Any], analysis: Optional[Dict[str, Any]] = None,
+                   name: Optional[str] = None, geometry: Optional[Tuple[Any, Any]] = None,
+                   compress: bool = True) -> int:
+        """
+        Stores one design and returns its id.
+
+        Args:
+            params: Calculation parameters (M, Z, z2, ...).
+            analysis: Optional computed values (contact_ratio, center_distance, undercut statuses).
+            name: Optional label, e.g. the working directory it came from.
+            geometry: Optional (gear1_profile, gear2_profile) to store as a blob.
+            compress: Whether the geometry blob is zlib-compressed.
+        """
+        with self.conn:
+            cursor = self.conn.execute(self._insert_sql(), self._row_values(params, analysis, name, None))
+            design_id = cursor.lastrowid
+            if geometry is not None:
+                self.conn.execute(
+                    'INSERT INTO geometry (design_id, encoding, data) VALUES (?, ?, ?)',
+                    (design_id, 'npz', encode_geometry(geometry[0], geometry[1], compress))
+                )
+        return design_id
+
+    def add_result(self, params: Dict[str, Any], result: Dict[str, Any], name: Optional[str] = None,
+                   store_geometry: bool = False, compress: bool = True) -> int:
+        """Stores a design together with the dictionary returned by gear_core.generate_gear_pair."""
+        analysis = {
+            'contact_ratio': result['analysis']['contact_ratio'],
+            'center_distance': result['analysis']['center_distance'],
+            'gear1_undercut_status': result['gear1']['undercut_status'],
+            'gear2_undercut_status': result['gear2']['undercut_status'],
+        }
+        geometry = (result['gear1']['profile'], result['gear2']['profile']) if store_geometry else None
+        return self.add_design(params, analysis, name, geometry, compress)
+
+    def bulk_add(self, records: Iterable[Dict[str, Any]], batch_size: int = 5000) -> int:
+        """
+        Inserts many designs in one transaction and returns how many were added.
+
+        Each record is a dict with 'params' and optional 'analysis', 'name' and 'created'.
+        Geometry is not stored by bulk inserts.
+        """
+        sql = self._insert_sql()
+        total = 0
+        with self.conn:
+            batch = []
+            for record in records:
+                batch.append(self._row_values(record['params'], record.get('analysis'),
+                                              record.get('name'), record.get('created')))
+                if len(batch) >= batch_size:
+                    self.conn.executemany(sql, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(sql, batch)
+                total += len(batch)
+        return total
+
+    def delete_design(self, design_id: int) -> bool:
+        with self.conn:
+            return self.conn.execute('DELETE FROM designs WHERE id = ?', (design_id,)).rowcount > 0
+
+    # --- Reading ---
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'created': row['created'],
+            'params': {key: row[key] for key in PARAM_COLUMNS if row[key] is not None},
+            'analysis': {key: row[key] for key in ANALYSIS_COLUMNS if row[key] is not None},
+        }
+
+    def get_design(self, design_id: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute('SELECT * FROM designs WHERE id = ?', (design_id,)).fetchone()
+        return self._record(row) if row else None
+
+    def get_geometry(self, design_id: int) -> Optional[Tuple[tuple, tuple]]:
+        """Returns the stored (gear1_profile, gear2_profile), or None if none was stored."""
+        row = self.conn.execute('SELECT encoding, data FROM geometry WHERE design_id = ?', (design_id,)).fetchone()
+        if row is None:
+            return None
+        if row['encoding'] != 'npz':
+            raise ValueError(f"Unsupported geometry encoding '{row['encoding']}'")
+        return decode_geometry(row['data'])
+
+    @staticmethod
+    def _where(module: Optional[float], z1: Optional[int], z2: Optional[int],
+               x1: Optional[Range], x2: Optional[Range], name: Optional[str],
+               min_contact_ratio: Optional[float]) -> Tuple[str, list]:
+        clauses, args = [], []
+        for column, value in (('M', module), ('Z', z1), ('z2', z2), ('name', name)):
+            if value is not None:
+                clauses.append(f'"{column}" = ?')
+                args.append(value)
+        for column, value in (('X', x1), ('x2', x2)):
+            if value is None:
+                continue
+            if isinstance(value, (tuple, list)):
+                low, high = value
+                if low is not None:
+                    clauses.append(f'"{column}" >= ?')
+                    args.append(low)
+                if high is not None:
+                    clauses.append(f'"{column}" <= ?')
+                    args.append(high)
+            else:
+                clauses.append(f'"{column}" = ?')
+                args.append(value)
+        if min_contact_ratio is not None:
+            clauses.append('contact_ratio >= ?')
+            args.append(min_contact_ratio)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', args
+
+    def find_designs(self, module: Optional[float] = None, z1: Optional[int] = None, z2: Optional[int] = None,
+                     x1: Optional[Range] = None, x2: Optional[Range] = None, name: Optional[str] = None,
+                     min_contact_ratio: Optional[float] = None, limit: Optional[int] = 100,
+                     offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Finds designs matching all given filters, newest first.
+
+        `x1` and `x2` take an exact value or a (low, high) range where either bound may be None.
+        """
+        where, args = self._where(module, z1, z2, x1, x2, name, min_contact_ratio)
+        sql = f'SELECT * FROM designs{where} ORDER BY created DESC, id DESC'
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            args += [limit, offset]
+        return [self._record(row) for row in self.conn.execute(sql, args)]
+
+    def count_designs(self, module: Optional[float] = None, z1: Optional[int] = None, z2: Optional[int] = None,
+                      x1: Optional[Range] = None, x2: Optional[Range] = None, name: Optional[str] = None,
+                      min_contact_ratio: Optional[float] = None) -> int:
+        where, args = self._where(module, z1, z2, x1, x2, name, min_contact_ratio)
+        return self.conn.execute(f'SELECT COUNT(*) FROM designs{where}', args).fetchone()[0]
+
+    def latest_design(self, name: str) -> Optional[Dict[str, Any]]:
+        """Returns the most recently stored design with the given name."""
+        designs = self.find_designs(name=name, limit=1)
+        return designs[0] if designs else None
+
+    # --- Bulk import / export ---
+
+    def import_inputs_dat(self, paths: Iterable[str]) -> int:
+        """
+        Imports legacy Inputs.dat files; directories are searched recursively.
+
+        Each design is named after the directory its Inputs.dat was found in.
+        """
+        def records():
+            for path in _iter_inputs_dat(paths):
+                params, analysis = read_inputs_dat(path)
+                yield {
+                    'params': params, 'analysis': analysis,
+                    'name': os.path.dirname(os.path.abspath(path)),
+                    'created': os.path.getmtime(path),
+                }
+        return self.bulk_add(records())
+
+    def export_jsonl(self, path: str, **filters: Any) -> int:
+        """Writes matching designs (without geometry) as JSON lines and returns the count."""
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            where, args = self._where(filters.get('module'), filters.get('z1'), filters.get('z2'),
+                                      filters.get('x1'), filters.get('x2'), filters.get('name'),
+                                      filters.get('min_contact_ratio'))
+            for row in self.conn.execute(f'SELECT * FROM designs{where} ORDER BY id', args):
+                record = self._record(row)
+                del record['id']
+                f.write(json.dumps(record) + '\n')
+                count += 1
+        return count
+
+    def import_jsonl(self, path: str) -> int:
+        """Bulk imports designs written by export_jsonl and returns the count."""
+        def records():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        return self.bulk_add(records())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the SQLite gear design library.")
+    parser.add_argument('library', help='Path of the SQLite library file.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_import = sub.add_parser('import', help='Import Inputs.dat files or directories, or a .jsonl export.')
+    p_import.add_argument('paths', nargs='+')
+    p_export = sub.add_parser('export', help='Export designs as JSON lines.')
+    p_export.add_argument('output')
+    p_find = sub.add_parser('find', help='List designs matching the filters.')
+    for p in (p_export, p_find):
+        p.add_argument('--module', type=float)
+        p.add_argument('--z1', type=int)
+        p.add_argument('--z2', type=int)
+        p.add_argument('--min-contact-ratio', type=float)
+    p_find.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with DesignLibrary(args.library) as library:
+        if args.command == 'import':
+            jsonl = [p for p in args.paths if p.endswith('.jsonl')]
+            count = sum(library.import_jsonl(p) for p in jsonl)
+            count += library.import_inputs_dat([p for p in args.paths if p not in jsonl])
+            print(f"Imported {count} design(s).")
+            return 0
+        filters = {'module': args.module, 'z1': args.z1, 'z2': args.z2, 'min_contact_ratio': args.min_contact_ratio}
+        if args.command == 'export':
+            print(f"Exported {library.export_jsonl(args.output, **filters)} design(s) to {args.output}")
+            return 0
+        for design in library.find_designs(limit=args.limit, **filters):
+            print(json.dumps({'id': design['id'], 'name': design['name'], **design['params'], **design['analysis']}))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
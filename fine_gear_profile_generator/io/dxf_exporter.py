@@ -1,7 +1,43 @@
 import ezdxf
-import numpy as np
 import os
 from ..core import transformations
+from ..utils import profiler
+from .atomic_writer import atomic_output_path
+
+DXF_FILENAME = 'Result_Gear_Pair.dxf'
+
+def build_gear_pair_document(patterned):
+    """
+    Builds an ezdxf document holding one closed polyline per tooth.
+
+    Args:
+        patterned (tuple): ((all_X1, all_Y1), (all_X2, all_Y2)) as returned by
+            transformations.pattern_gear_pair.
+    """
+    with profiler.span('dxf.new_document'):
+        doc = ezdxf.new('R2000')
+        msp = doc.modelspace()
+
+    # Gear 1 is drawn in blue (5), gear 2 in red (1)
+    for gear_index, ((all_X, all_Y), color) in enumerate(zip(patterned, (5, 1)), start=1):
+        with profiler.span('dxf.add_gear', gear=gear_index):
+            for X_final, Y_final in zip(all_X, all_Y):
+                msp.add_lwpolyline(list(zip(X_final, Y_final)), close=True, dxfattribs={'color': color})
+            profiler.count('dxf_entities_written', len(all_X))
+
+    return doc
+
+def write_gear_pair_dxf(output_path, patterned):
+    """
+    Writes an already patterned gear pair to `output_path`.
+
+    Errors are raised to the caller; see atomic_output_path for crash-safe writes.
+    """
+    doc = build_gear_pair_document(patterned)
+    with profiler.span('dxf.saveas', path=output_path):
+        doc.saveas(output_path)
+    if profiler.is_enabled() and isinstance(output_path, str):
+        profiler.count('bytes_written', os.path.getsize(output_path))
 
 def export_gear_pair_to_dxf(working_dir, gear1_data, gear2_data, center_dist, x_offset, y_offset):
     """
@@ -15,36 +51,13 @@ def export_gear_pair_to_dxf(working_dir, gear1_data, gear2_data, center_dist, x_
         x_offset (float): The X-coordinate of the center of the first gear.
         y_offset (float): The Y-coordinate of the center of the first gear.
     """
-    doc = ezdxf.new('R2000')
-    msp = doc.modelspace()
-
-    # --- Draw Gear 1 ---
-    X_tooth1, Y_tooth1, Z1, P_ANGLE1, ALIGN_ANGLE1 = gear1_data
-    # First, align the tooth profile
-    X_rot1, Y_rot1 = transformations.rotate(X_tooth1, Y_tooth1, ALIGN_ANGLE1)
-    # Then, create the full gear by rotating the single tooth
-    for i in range(int(Z1)):
-        X_temp, Y_temp = transformations.rotate(X_rot1, Y_rot1, P_ANGLE1 * i)
-        # Finally, move the gear to its final position
-        X_final, Y_final = transformations.translate(X_temp, Y_temp, x_offset, y_offset)
-        msp.add_lwpolyline(list(zip(X_final, Y_final)), close=True, dxfattribs={'color': 5})  # Blue
-
-    # --- Draw Gear 2 ---
-    X_tooth2, Y_tooth2, Z2, P_ANGLE2, ALIGN_ANGLE2 = gear2_data
-    # The second gear needs an initial rotation to mesh correctly
-    initial_rotation2 = np.pi + (np.pi / Z2)
-    # First, align the tooth profile with the initial meshing rotation
-    X_rot2, Y_rot2 = transformations.rotate(X_tooth2, Y_tooth2, ALIGN_ANGLE2 + initial_rotation2)
-    # Then, create the full gear
-    for i in range(int(Z2)):
-        X_temp, Y_temp = transformations.rotate(X_rot2, Y_rot2, P_ANGLE2 * i)
-        # Finally, move the gear to its final position (offset by center distance)
-        X_final, Y_final = transformations.translate(X_temp, Y_temp, x_offset + center_dist, y_offset)
-        msp.add_lwpolyline(list(zip(X_final, Y_final)), close=True, dxfattribs={'color': 1})  # Red
-
-    # Save the DXF file
-    output_path = os.path.join(working_dir, 'Result_Gear_Pair.dxf')
+    with profiler.span('dxf.pattern'):
+        patterned = transformations.pattern_gear_pair(gear1_data, gear2_data, center_dist, x_offset, y_offset)
+
+    # Save the DXF file via a temporary file so a failed save leaves no partial output
+    output_path = os.path.join(working_dir, DXF_FILENAME)
     try:
-        doc.saveas(output_path)
+        with atomic_output_path(output_path) as tmp_path:
+            write_gear_pair_dxf(tmp_path, patterned)
     except IOError:
-        print(f"Error: Could not save DXF file to {output_path}.")
\ No newline at end of file
+        print(f"Error: Could not save DXF file to {output_path}.")
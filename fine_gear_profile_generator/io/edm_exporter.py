@@ -0,0 +1,453 @@
+"""
+Wire-EDM toolpath exporter.
+
+The patterned outline of each gear is joined into one closed contour and offset
+by the wire radius plus the spark gap: outwards for an external gear, inwards
+(into the bore) for an internal gear. Vertices are offset along the bisector of
+the neighbouring edge normals in one vectorized pass; corners that open up get a
+round join, and the loops an offset leaves behind at tight root fillets are cut
+out with a windowed segment intersection test around the reversed edges.
+
+The offset contour is then fitted greedily with G1 lines and G2/G3 arcs that stay
+within `tolerance` of every point and streamed to disk as ISO G-code (G21, G90,
+I/J incremental arc centres). The offset is applied here, so the program runs
+with compensation off (G40). Wire threading and cutting are controller specific;
+the program stops with M00 after each gear so the operator (or the post) can
+rethread.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+
+from ..utils import profiler
+
+EDM_FILENAME = 'Result_Gear_Pair_EDM.nc'
+DEFAULT_WIRE_DIAMETER = 0.1
+DEFAULT_SPARK_GAP = 0.015
+DEFAULT_TOLERANCE = 0.0005
+DEFAULT_LEAD_IN = 0.5
+# Cutting feed in mm/min, a conservative main-cut speed for thin brass wire;
+# adaptive controllers override it with their own servo feed
+DEFAULT_FEED = 2.0
+
+# Corners whose miter would exceed this multiple of the offset get a round join
+MITER_LIMIT = 2.0
+# Nearly straight runs with a larger arc radius are written as lines
+MAX_ARC_RADIUS = 1e4
+_WRITE_CHUNK = 4096
+
+
+def closed_contour(all_X: Sequence[np.ndarray], all_Y: Sequence[np.ndarray], eps: float = 1e-9) -> np.ndarray:
+    """Joins the patterned teeth into one (N, 2) contour without repeated points."""
+    points = np.column_stack((np.concatenate(all_X), np.concatenate(all_Y)))
+    step = np.hypot(*np.diff(points, axis=0, append=points[:1]).T)
+    return points[step > eps]
+
+
+def signed_area(points: np.ndarray) -> float:
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * float(np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y))
+
+
+def _edge_normals(points: np.ndarray, side: float) -> np.ndarray:
+    """Unit normals of the edges points[i] -> points[i + 1], pointing to the offset side."""
+    edges = np.roll(points, -1, axis=0) - points
+    lengths = np.hypot(edges[:, 0], edges[:, 1])[:, None]
+    # (dy, -dx) points to the right of the edge, i.e. outwards for a counter-clockwise contour
+    return side * np.column_stack((edges[:, 1], -edges[:, 0])) / lengths
+
+
+def _round_join(center: np.ndarray, start: np.ndarray, end: np.ndarray, distance: float, tolerance: float) -> np.ndarray:
+    a0 = np.arctan2(start[1], start[0])
+    sweep = (np.arctan2(end[1], end[0]) - a0 + np.pi) % (2 * np.pi) - np.pi
+    max_step = 2 * np.arccos(max(-1.0, 1 - tolerance / distance))
+    steps = max(1, int(np.ceil(abs(sweep) / max_step)))
+    angles = a0 + sweep * np.linspace(0.0, 1.0, steps + 1)
+    return center + distance * np.column_stack((np.cos(angles), np.sin(angles)))
+
+
+def _offset(points: np.ndarray, distance: float, outward: bool, tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the offset contour and a mask of its segments that reversed direction."""
+    orientation = 1.0 if signed_area(points) > 0 else -1.0
+    side = orientation * (1.0 if outward else -1.0)
+    n_next = _edge_normals(points, side)
+    n_prev = np.roll(n_next, 1, axis=0)
+
+    # Intersection of the two offset edges meeting at each vertex
+    denom = 1.0 + np.einsum('ij,ij->i', n_prev, n_next)
+    miter = (n_prev + n_next) / np.maximum(denom, 2.0 / MITER_LIMIT ** 2)[:, None]
+    offset = points + distance * miter
+
+    # An offset edge pointing against its original edge is part of a loop
+    edges = np.roll(points, -1, axis=0) - points
+    reversed_edges = np.einsum('ij,ij->i', edges, np.roll(offset, -1, axis=0) - offset) < 0
+
+    # Corners turning away from the offset side open a gap: bridge it with an arc
+    turn = np.roll(edges, 1, axis=0)[:, 0] * edges[:, 1] - np.roll(edges, 1, axis=0)[:, 1] * edges[:, 0]
+    opening = (turn * side * orientation > 0) & (denom < 2.0 / MITER_LIMIT ** 2)
+    if not opening.any():
+        return offset, reversed_edges
+    pieces, flags, last = [], [], 0
+    for i in np.flatnonzero(opening):
+        join = _round_join(points[i], distance * n_prev[i], distance * n_next[i], distance, tolerance)
+        pieces += [offset[last:i], join]
+        flags += [reversed_edges[last:i], np.zeros(len(join) - 1, dtype=bool), reversed_edges[i:i + 1]]
+        last = i + 1
+    pieces.append(offset[last:])
+    flags.append(reversed_edges[last:])
+    return np.vstack(pieces), np.concatenate(flags)
+
+
+def offset_contour(points: np.ndarray, distance: float, outward: bool = True,
+                   tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+    """
+    Offsets a closed contour by `distance`, outwards or inwards.
+
+    Returns the raw offset contour; it may still contain loops at concave corners
+    tighter than `distance` (see remove_loops).
+    """
+    return _offset(points, distance, outward, tolerance)[0]
+
+
+def _segment_intersections(points: np.ndarray, i: np.ndarray, j: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Tests segments i and j (index arrays, segment k = points[k] -> points[k + 1])."""
+    p, r = points[i], points[i + 1] - points[i]
+    q, s = points[j], points[j + 1] - points[j]
+    denom = r[:, 0] * s[:, 1] - r[:, 1] * s[:, 0]
+    qp = q - p
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (qp[:, 0] * s[:, 1] - qp[:, 1] * s[:, 0]) / denom
+        u = (qp[:, 0] * r[:, 1] - qp[:, 1] * r[:, 0]) / denom
+    hit = (denom != 0) & (t > 0) & (t < 1) & (u > 0) & (u < 1)
+    return hit, p + t[:, None] * r
+
+
+def remove_loops(offset: np.ndarray, suspect: Optional[np.ndarray] = None, window: int = 64,
+                 closed: bool = True, max_passes: int = 8) -> np.ndarray:
+    """
+    Cuts out local self-intersection loops of an offset contour.
+
+    Only segments within `window` of a suspect segment (an edge that reversed
+    direction, the signature of a loop) are tested, so the cost grows with the
+    number of tight corners rather than with the contour length. The contour must
+    not start inside a loop.
+
+    Args:
+        offset: (N, 2) offset contour; a closed one does not repeat its first point.
+        suspect: Boolean mask of suspect segments (segment k runs from point k to
+            k + 1), or None to test around every segment.
+        window: Largest number of segments a loop may span.
+        closed: Whether the last point joins back to the first.
+    """
+    for _ in range(max_passes):
+        points = np.vstack((offset, offset[:1])) if closed else offset
+        segments = len(points) - 1
+        if suspect is None:
+            candidates = np.arange(segments)
+        elif not suspect.any():
+            return offset
+        else:
+            # Dilate the suspect segments by the window to get the candidates
+            counts = np.convolve(suspect.astype(np.int32), np.ones(2 * window + 1, dtype=np.int32), mode='same')
+            candidates = np.flatnonzero(counts > 0)
+
+        hits_i, hits_j, hits_x = [], [], []
+        for k in range(2, window + 1):
+            i = candidates[candidates + k < segments]
+            if not len(i):
+                break
+            hit, x = _segment_intersections(points, i, i + k)
+            if hit.any():
+                hits_i.append(i[hit])
+                hits_j.append(i[hit] + k)
+                hits_x.append(x[hit])
+        if not hits_i:
+            return offset
+
+        hits_i = np.concatenate(hits_i)
+        hits_j = np.concatenate(hits_j)
+        hits_x = np.vstack(hits_x)
+        # Outermost loop first: smallest start, then largest end
+        order = np.lexsort((-hits_j, hits_i))
+        pieces, cuts, last, end, length = [], [], 0, -1, 0
+        for n in order:
+            i, j = hits_i[n], hits_j[n]
+            if i <= end:
+                continue  # nested in, or overlapping, a loop already cut out
+            pieces += [offset[last:i + 1], hits_x[n:n + 1]]
+            length += i + 1 - last
+            cuts.append(length)
+            length += 1
+            last, end = j + 1, j
+        pieces.append(offset[last:])
+        offset = np.vstack(pieces)
+        # Look again only around the cuts, for loops that overlapped the ones removed
+        suspect = np.zeros(len(offset) - (0 if closed else 1), dtype=bool)
+        suspect[cuts] = True
+    return offset
+
+
+def _fits_line(points: np.ndarray, i: int, j: int, tolerance: float) -> bool:
+    start, end = points[i], points[j]
+    chord = end - start
+    length = np.hypot(chord[0], chord[1])
+    if j - i < 2:
+        return True
+    if length == 0:
+        return False
+    inner = points[i + 1:j] - start
+    distance = np.abs(inner[:, 0] * chord[1] - inner[:, 1] * chord[0]) / length
+    along = (inner @ chord) / (length * length)
+    return bool(distance.max() <= tolerance and along.min() >= 0 and along.max() <= 1)
+
+
+def _fit_arc(points: np.ndarray, i: int, j: int, tolerance: float):
+    """Returns (center, ccw) if points i..j lie on one arc within tolerance, else None."""
+    if j - i < 2:
+        return None
+    p1, p2, p3 = points[i], points[(i + j) // 2], points[j]
+    cross = (p2[0] - p1[0]) * (p3[1] - p1[1]) - (p2[1] - p1[1]) * (p3[0] - p1[0])
+    if cross == 0:
+        return None
+    a, b = p2 - p1, p3 - p1
+    aa, bb = a @ a, b @ b
+    d = 2 * (a[0] * b[1] - a[1] * b[0])
+    center = p1 + np.array([b[1] * aa - a[1] * bb, a[0] * bb - b[0] * aa]) / d
+    radius = np.hypot(*(p1 - center))
+    if radius > MAX_ARC_RADIUS:
+        return None
+    span = points[i:j + 1] - center
+    # Check the segment midpoints too: between sparse points an arc can bulge away from the polyline
+    samples = np.vstack((span, (span[:-1] + span[1:]) / 2))
+    if np.abs(np.hypot(samples[:, 0], samples[:, 1]) - radius).max() > tolerance:
+        return None
+    # Every step must turn the same way, and the whole arc less than a full circle
+    a, b = span[:-1], span[1:]
+    turns = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+    ccw = cross > 0
+    if (ccw and turns.min() <= 0) or (not ccw and turns.max() >= 0):
+        return None
+    steps = np.arctan2(turns, np.einsum('ij,ij->i', a, b))
+    if abs(steps.sum()) >= 2 * np.pi - 1e-6:
+        return None
+    return center, ccw
+
+
+def _longest(fits, i: int, last: int) -> int:
+    """Largest j in (i, last] with fits(i, j), assuming shorter spans fit when longer ones do."""
+    good, step = i + 1, 2
+    bad = None
+    while True:
+        j = min(i + step, last)
+        if fits(i, j):
+            good = j
+            if j == last:
+                return good
+            step *= 2
+        else:
+            bad = j
+            break
+    while bad - good > 1:
+        mid = (good + bad) // 2
+        if fits(i, mid):
+            good = mid
+        else:
+            bad = mid
+    return good
+
+
+def fit_moves(points: np.ndarray, tolerance: float = DEFAULT_TOLERANCE) -> Iterator[tuple]:
+    """
+    Greedily covers the polyline with the longest line or arc at each step.
+
+    Yields ('G1', end) or ('G2'/'G3', end, center) moves starting from points[0].
+    """
+    last = len(points) - 1
+    i = 0
+    while i < last:
+        j_line = _longest(lambda a, b: _fits_line(points, a, b, tolerance), i, last)
+        j_arc = _longest(lambda a, b: _fit_arc(points, a, b, tolerance) is not None, i, last)
+        if j_arc > j_line:
+            center, ccw = _fit_arc(points, i, j_arc, tolerance)
+            yield ('G3' if ccw else 'G2', points[j_arc], center)
+            i = j_arc
+        else:
+            yield ('G1', points[j_line])
+            i = j_line
+
+
+@dataclass(frozen=True)
+class Toolpath:
+    """
+    A closed wire path made of `copies` copies of `points`, each turned by `pitch`
+    radians about `center` from the one before. `points` runs from the start of
+    one copy to the start of the next (for a single copy, back to its start).
+    """
+    points: np.ndarray
+    center: Tuple[float, float]
+    copies: int = 1
+    pitch: float = 0.0
+
+
+def _rotate(points: np.ndarray, center: np.ndarray, angle: float) -> np.ndarray:
+    c, s = np.cos(angle), np.sin(angle)
+    relative = points - center
+    return center + np.column_stack((c * relative[:, 0] - s * relative[:, 1], s * relative[:, 0] + c * relative[:, 1]))
+
+
+def _tooth_pitch(points: np.ndarray, period: int, copies: int, center: np.ndarray, atol: float) -> Optional[float]:
+    """Returns the pitch angle if points repeat every `period` points by rotation, else None."""
+    if copies < 2 or len(points) != period * copies:
+        return None
+    first = points[0] - center
+    second = points[period] - center
+    pitch = float(np.arctan2(first[0] * second[1] - first[1] * second[0], first @ second))
+    # Turn the first tooth by every multiple of the pitch at once and compare all copies
+    angles = pitch * np.arange(copies)[:, None]
+    c, s = np.cos(angles), np.sin(angles)
+    head = points[:period] - center
+    expected = np.stack((c * head[:, 0] - s * head[:, 1], s * head[:, 0] + c * head[:, 1]), axis=-1) + center
+    if not np.allclose(expected, points.reshape(copies, period, 2), rtol=0, atol=atol):
+        return None
+    return pitch
+
+
+def gear_toolpath(all_X: Sequence[np.ndarray], all_Y: Sequence[np.ndarray], center: Sequence[float],
+                  internal: bool, offset: float, tolerance: float = DEFAULT_TOLERANCE) -> Toolpath:
+    """
+    Wire path around one patterned gear, starting where a loop can never form
+    (a tooth tip for external gears, the inner tip of a ring gear tooth for
+    internal ones).
+
+    The offset of a patterned gear repeats every tooth, so loops are removed (and
+    moves later fitted) on one pitch only and the result is turned into place.
+    """
+    center = np.asarray(center, dtype=float)
+    contour = closed_contour(all_X, all_Y)
+    teeth = len(all_X)
+    with profiler.span('edm.offset', points=len(contour)):
+        # Start well away from any loop: the outermost point when growing, the innermost when shrinking
+        radius = np.hypot(contour[:, 0] - center[0], contour[:, 1] - center[1])
+        start = int(np.argmin(radius) if internal else np.argmax(radius))
+        contour = np.roll(contour, -start, axis=0)
+        raw, suspect = _offset(contour, offset, not internal, tolerance)
+        period = len(raw) // max(teeth, 1)
+        # A loop cannot span more than one tooth pitch
+        window = max(8, period)
+        pitch = _tooth_pitch(raw, period, teeth, center, atol=tolerance * 1e-3)
+        if pitch is None:
+            path = remove_loops(raw, suspect, window=window)
+            return Toolpath(np.vstack((path, path[:1])), tuple(center))
+        path = remove_loops(raw[:period + 1], suspect[:period], window=window, closed=False)
+    return Toolpath(path, tuple(center), teeth, pitch)
+
+
+def _format(value: float, decimals: int) -> str:
+    text = f"{value:.{decimals}f}"
+    return '0.' + '0' * decimals if text == '-0.' + '0' * decimals else text
+
+
+def _toolpath_lines(toolpath: Toolpath, tolerance: float, fmt) -> Iterator[str]:
+    """Fits one copy of the toolpath and yields the G-code lines for every copy."""
+    points = toolpath.points
+    moves = list(fit_moves(points, tolerance))
+    codes = [move[0] for move in moves]
+    ends = np.array([move[1] for move in moves])
+    starts = np.vstack((points[:1], ends[:-1]))
+    # Arc centres relative to the start of each move (I, J); unused for lines
+    arc_offsets = np.array([move[2] if len(move) > 2 else start for move, start in zip(moves, starts)]) - starts
+    center = np.asarray(toolpath.center)
+    for copy in range(toolpath.copies):
+        angle = copy * toolpath.pitch
+        copy_ends = _rotate(ends, center, angle)
+        copy_offsets = _rotate(arc_offsets, np.zeros(2), angle)
+        for code, end, ij in zip(codes, copy_ends, copy_offsets):
+            if code == 'G1':
+                yield f"G1 X{fmt(end[0])} Y{fmt(end[1])}"
+            else:
+                yield f"{code} X{fmt(end[0])} Y{fmt(end[1])} I{fmt(ij[0])} J{fmt(ij[1])}"
+
+
+def write_program(stream: TextIO, paths: List[Dict[str, Any]], tolerance: float = DEFAULT_TOLERANCE,
+                  decimals: int = 4, feed: float = DEFAULT_FEED, header: Sequence[str] = ()) -> int:
+    """
+    Streams the G-code for a list of toolpaths and returns the number of moves.
+
+    Each entry of `paths` holds 'toolpath' (a Toolpath), 'lead' (threading point)
+    and 'label' (comment text). The feed (mm/min) is set on the entry move of
+    every contour and stays modal for the cut.
+    """
+    if not feed > 0:
+        raise ValueError(f"Feed must be positive, got {feed}")
+    fmt = lambda v: _format(v, decimals)
+    lines = ['%'] + [f"({text})" for text in header] + ['G21 G90 G17 G40']
+    moves = 0
+    for entry in paths:
+        start, lead = entry['toolpath'].points[0], entry['lead']
+        lines += [f"({entry['label']})", f"G0 X{fmt(lead[0])} Y{fmt(lead[1])}", '(THREAD WIRE)']
+        lines.append(f"G1 X{fmt(start[0])} Y{fmt(start[1])} F{fmt(feed)}")
+        for line in _toolpath_lines(entry['toolpath'], tolerance, fmt):
+            lines.append(line)
+            moves += 1
+            if len(lines) >= _WRITE_CHUNK:
+                stream.write('\n'.join(lines) + '\n')
+                lines = []
+        lines += [f"G1 X{fmt(lead[0])} Y{fmt(lead[1])}", 'M00']
+    lines += ['M30', '%']
+    stream.write('\n'.join(lines) + '\n')
+    return moves
+
+
+def write_gear_pair_edm(output_path: str, job: Dict[str, Any], wire_diameter: float = DEFAULT_WIRE_DIAMETER,
+                        spark_gap: float = DEFAULT_SPARK_GAP, tolerance: float = DEFAULT_TOLERANCE,
+                        lead_in: float = DEFAULT_LEAD_IN, gears: Sequence[int] = (1, 2),
+                        feed: float = DEFAULT_FEED, decimals: int = 4) -> int:
+    """
+    Writes a wire-EDM program cutting the selected gears of the pair.
+
+    Args:
+        output_path: File to write.
+        job: Export job from export_pipeline.build_export_job.
+        wire_diameter, spark_gap: The wire path is offset by wire_diameter / 2 + spark_gap.
+        tolerance: Largest allowed deviation of the fitted moves from the offset contour.
+        lead_in: Radial distance from the threading point to the contour.
+        gears: Which gears to cut (1 and/or 2).
+        feed: Cutting feed in mm/min (DEFAULT_FEED unless given).
+
+    Returns:
+        int: The number of contour moves written.
+    """
+    params = job['params']
+    offset = wire_diameter / 2 + spark_gap
+    x0, y0 = params.get('X_0', 0.0), params.get('Y_0', 0.0)
+    centers = {1: (x0, y0), 2: (x0 + job['center_distance'], y0)}
+    teeth = {1: params['Z'], 2: params['z2']}
+
+    paths = []
+    for gear in gears:
+        all_X, all_Y = job['patterned'][gear - 1]
+        internal = teeth[gear] < 0
+        toolpath = gear_toolpath(all_X, all_Y, centers[gear], internal, offset, tolerance)
+        start = toolpath.points[0]
+        radial = start - np.asarray(centers[gear])
+        direction = -1.0 if internal else 1.0
+        lead = start + direction * lead_in * radial / np.hypot(radial[0], radial[1])
+        kind = 'INTERNAL' if internal else 'EXTERNAL'
+        paths.append({'toolpath': toolpath, 'lead': lead, 'label': f"GEAR {gear}: Z={abs(teeth[gear])} {kind}"})
+
+    header = [
+        f"FGPG WIRE-EDM PROGRAM M={params['M']} Z1={params['Z']} Z2={params['z2']}",
+        f"WIRE D={wire_diameter} GAP={spark_gap} OFFSET={offset:.4f} TOL={tolerance}",
+    ]
+    with profiler.span('edm.write', path=output_path):
+        with open(output_path, 'w', encoding='ascii', newline='\n') as f:
+            moves = write_program(f, paths, tolerance, decimals, feed, header)
+    profiler.count('edm_moves_written', moves)
+    if profiler.is_enabled():
+        profiler.count('bytes_written', os.path.getsize(output_path))
+    return moves
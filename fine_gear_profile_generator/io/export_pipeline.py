@@ -0,0 +1,207 @@
+"""
+Concurrent export pipeline with a registry of named exporters.
+
+The gear pair is patterned once and the shared geometry is handed to every
+selected exporter. Exporters registered as 'thread' (I/O-bound writers) run in a
+thread pool; 'process' exporters (CPU-bound renderers) run in a process pool, so
+the end-to-end latency is that of the slowest exporter. Every exporter writes to a
+temporary file that is renamed into place, so a failure never leaves a
+half-written file. While profiling, process exporters record into a tracer of
+their own whose spans and counters are merged into the parent's trace.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..core import transformations
+from ..utils import profiler
+from . import animation_exporter, dxf_exporter, edm_exporter, image_exporter
+from .atomic_writer import atomic_output_path
+
+EXECUTOR_KINDS = ('thread', 'process')
+
+
+@dataclass(frozen=True)
+class Exporter:
+    """A registered exporter: `func(path, job)` writes one file to `path`."""
+    name: str
+    func: Callable[[str, Dict[str, Any]], None]
+    filename: str
+    executor: str = 'thread'
+
+
+_REGISTRY: Dict[str, Exporter] = {}
+
+
+def register_exporter(name: str, func: Callable[[str, Dict[str, Any]], None],
+                      filename: str, executor: str = 'thread') -> Exporter:
+    """
+    Registers an exporter under `name`.
+
+    `func` must be a module-level function so it can be sent to a worker process.
+    It receives a temporary path (with the final extension) and the job dictionary
+    built by `build_export_job`; the pipeline renames the file into place.
+    """
+    if executor not in EXECUTOR_KINDS:
+        raise ValueError(f"Unknown executor kind '{executor}', expected one of {EXECUTOR_KINDS}")
+    exporter = Exporter(name, func, filename, executor)
+    _REGISTRY[name] = exporter
+    return exporter
+
+
+def get_exporter(name: str) -> Exporter:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown exporter '{name}'. Available: {', '.join(available_exporters())}") from None
+
+
+def available_exporters() -> List[str]:
+    return sorted(_REGISTRY)
+
+
+def build_export_job(result: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Patterns the gear pair once and collects everything the exporters need."""
+    center_dist = result['analysis']['center_distance']
+    with profiler.span('export.pattern'):
+        patterned = transformations.pattern_gear_pair(
+            result['gear1']['profile'], result['gear2']['profile'], center_dist,
+            params.get('X_0', 0.0), params.get('Y_0', 0.0)
+        )
+    return {
+        'patterned': patterned,
+        'gear1_profile': result['gear1']['profile'],
+        'gear2_profile': result['gear2']['profile'],
+        'center_distance': center_dist,
+        'params': {k: v for k, v in params.items() if not k.startswith('_')},
+    }
+
+
+def _export_png(output_path: str, job: Dict[str, Any]) -> None:
+    params = job['params']
+    image_exporter.write_gear_pair_image(
+        output_path, job['patterned'], job['center_distance'],
+        params['M'], params['Z'], params['z2']
+    )
+
+
+def _export_dxf(output_path: str, job: Dict[str, Any]) -> None:
+    dxf_exporter.write_gear_pair_dxf(output_path, job['patterned'])
+
+
+def _export_gif(output_path: str, job: Dict[str, Any]) -> None:
+    animation_exporter.write_gear_pair_animation(output_path, job, fmt='gif')
+
+
+def _export_apng(output_path: str, job: Dict[str, Any]) -> None:
+    animation_exporter.write_gear_pair_animation(output_path, job, fmt='apng')
+
+
+def _export_edm(output_path: str, job: Dict[str, Any]) -> None:
+    edm_exporter.write_gear_pair_edm(output_path, job)
+
+
+def _run_exporter(name: str, func: Callable[[str, Dict[str, Any]], None],
+                  output_path: str, job: Dict[str, Any]) -> str:
+    with profiler.span('export.run', exporter=name):
+        with atomic_output_path(output_path) as tmp_path:
+            func(tmp_path, job)
+    return output_path
+
+
+def _run_exporter_traced(name: str, func: Callable[[str, Dict[str, Any]], None],
+                         output_path: str, job: Dict[str, Any], origin_ns: int):
+    """Process-pool variant of _run_exporter that also returns the worker's trace data."""
+    tracer = profiler.enable(origin_ns)
+    try:
+        _run_exporter(name, func, output_path, job)
+    finally:
+        profiler.disable()
+    return output_path, tracer.events, tracer.counters
+
+
+def run_exporters(names: Iterable[str], working_dir: str, result: Dict[str, Any],
+                  params: Dict[str, Any], filenames: Optional[Dict[str, str]] = None,
+                  max_workers: Optional[int] = None, use_processes: bool = True,
+                  job: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """
+    Runs the named exporters concurrently and returns {name: output_path}.
+
+    Args:
+        names: Exporter names, e.g. ['png', 'dxf'].
+        working_dir: Directory the files are written to.
+        result: The dictionary returned by gear_core.generate_gear_pair.
+        params: The calculation parameters used to produce `result`.
+        filenames: Optional per-exporter overrides of the default filenames.
+        max_workers: Upper bound for each pool (defaults to one worker per exporter).
+        use_processes: If False, 'process' exporters run in the thread pool too.
+        job: A job from build_export_job to reuse instead of patterning again.
+
+    Raises:
+        RuntimeError: If any exporter failed. All other exporters still complete.
+    """
+    exporters = [get_exporter(name) for name in dict.fromkeys(names)]
+    if not exporters:
+        return {}
+    filenames = filenames or {}
+    if job is None:
+        job = build_export_job(result, params)
+
+    process_jobs = [e for e in exporters if use_processes and e.executor == 'process']
+    thread_jobs = [e for e in exporters if e not in process_jobs]
+
+    futures = {}
+    tracer = profiler.active_tracer()
+    process_pool = thread_pool = None
+    try:
+        # Submit process work first so workers are forked before any writer thread starts.
+        if process_jobs:
+            process_pool = ProcessPoolExecutor(max_workers=min(len(process_jobs), max_workers or len(process_jobs)))
+            for e in process_jobs:
+                path = os.path.join(working_dir, filenames.get(e.name, e.filename))
+                if tracer is None:
+                    futures[e.name] = process_pool.submit(_run_exporter, e.name, e.func, path, job)
+                else:
+                    futures[e.name] = process_pool.submit(_run_exporter_traced, e.name, e.func, path, job,
+                                                          tracer.origin_ns)
+        if thread_jobs:
+            thread_pool = ThreadPoolExecutor(max_workers=min(len(thread_jobs), max_workers or len(thread_jobs)),
+                                             thread_name_prefix='fgpg-export')
+            for e in thread_jobs:
+                path = os.path.join(working_dir, filenames.get(e.name, e.filename))
+                futures[e.name] = thread_pool.submit(_run_exporter, e.name, e.func, path, job)
+
+        outputs, failures = {}, {}
+        with profiler.span('export.wait', exporters=list(futures)):
+            for name, future in futures.items():
+                try:
+                    output = future.result()
+                except Exception as exc:
+                    failures[name] = exc
+                    continue
+                if isinstance(output, tuple):
+                    output, events, counters = output
+                    tracer.merge(events, counters)
+                outputs[name] = output
+    finally:
+        for pool in (process_pool, thread_pool):
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+    if failures:
+        details = '; '.join(f"{name}: {exc}" for name, exc in failures.items())
+        raise RuntimeError(f"Export failed for {details}")
+    return outputs
+
+
+register_exporter('png', _export_png, image_exporter.PNG_FILENAME, executor='process')
+register_exporter('dxf', _export_dxf, dxf_exporter.DXF_FILENAME, executor='thread')
+register_exporter('edm', _export_edm, edm_exporter.EDM_FILENAME, executor='process')
+# The animation exporters fan frames out to their own process pool, so they are
+# driven from a thread (worker processes cannot start pools of their own).
+register_exporter('gif', _export_gif, 'Result_Animation.gif', executor='thread')
+register_exporter('apng', _export_apng, 'Result_Animation.apng', executor='thread')
@@ -1,6 +1,51 @@
 import os
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from ..core import transformations
+from ..utils import profiler
+from .atomic_writer import atomic_output_path
+
+PNG_FILENAME = 'Result1.png'
+
+def write_gear_pair_image(output_path, patterned, center_dist, m_val, z1_val, z2_val):
+    """
+    Renders an already patterned gear pair and saves it as a PNG.
+
+    An Agg canvas is used directly instead of pyplot, so rendering does not depend
+    on the GUI backend and is safe in worker threads and processes. Errors are
+    raised to the caller.
+
+    Args:
+        output_path (str or file-like): Path or binary stream the PNG is written to.
+        patterned (tuple): ((all_X1, all_Y1), (all_X2, all_Y2)) as returned by
+            transformations.pattern_gear_pair.
+        center_dist (float): Distance between gear centers.
+        m_val (float): Module of the gears.
+        z1_val (int): Number of teeth for gear 1.
+        z2_val (int): Number of teeth for gear 2.
+    """
+    with profiler.span('png.new_figure'):
+        fig = Figure(figsize=(8, 8))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        ax.set_aspect('equal')
+        ax.set_title('Fine Gear Profile Generator - Gear Pair Preview')
+        ax.grid(True)
+
+    for gear_index, ((all_X, all_Y), color) in enumerate(zip(patterned, ('blue', 'red')), start=1):
+        with profiler.span('png.plot_gear', gear=gear_index):
+            for X_final, Y_final in zip(all_X, all_Y):
+                ax.plot(X_final, Y_final, '-', linewidth=1.5, color=color)
+
+    # Set plot limits for a good view
+    ax.set_xlim(-m_val * z1_val / 1.5, center_dist + m_val * z2_val / 1.5)
+    ax.set_ylim(-m_val * max(z1_val, z2_val) * 1.2, m_val * max(z1_val, z2_val) * 1.2)
+
+    # Save the figure (rendering happens inside savefig)
+    with profiler.span('png.render_and_save', path=output_path):
+        fig.savefig(output_path, dpi=100)
+    if profiler.is_enabled() and isinstance(output_path, str):
+        profiler.count('bytes_written', os.path.getsize(output_path))
 
 def export_gear_pair_to_image(working_dir, gear1_data, gear2_data, center_dist, m_val, z1_val, z2_val, x_offset=0.0, y_offset=0.0):
     """
@@ -17,42 +62,13 @@ def export_gear_pair_to_image(working_dir, gear1_data, gear2_data, center_dist,
         x_offset (float): X-coordinate of the center of the first gear.
         y_offset (float): Y-coordinate of the center of the first gear.
     """
-    if 'DISPLAY' not in os.environ and 'XDG_SESSION_TYPE' not in os.environ:
-        plt.switch_backend('Agg')
-
-    fig = plt.figure(figsize=(8, 8))
-    ax = fig.add_subplot(111)
-    ax.set_aspect('equal')
-    ax.set_title('Fine Gear Profile Generator - Gear Pair Preview')
-    ax.grid(True)
-
-    # --- Plot Gear 1 ---
-    X_tooth1, Y_tooth1, Z1, P_ANGLE1, ALIGN_ANGLE1 = gear1_data
-    X_rot1, Y_rot1 = transformations.rotate(X_tooth1, Y_tooth1, ALIGN_ANGLE1)
-    for i in range(int(Z1)):
-        X_temp, Y_temp = transformations.rotate(X_rot1, Y_rot1, P_ANGLE1 * i)
-        X_final, Y_final = transformations.translate(X_temp, Y_temp, x_offset, y_offset)
-        ax.plot(X_final, Y_final, '-', linewidth=1.5, color='blue')
-
-    # --- Plot Gear 2 ---
-    X_tooth2, Y_tooth2, Z2, P_ANGLE2, ALIGN_ANGLE2 = gear2_data
-    import numpy as np
-    initial_rotation2 = np.pi + (np.pi / Z2)
-    X_rot2, Y_rot2 = transformations.rotate(X_tooth2, Y_tooth2, ALIGN_ANGLE2 + initial_rotation2)
-    for i in range(int(Z2)):
-        X_temp, Y_temp = transformations.rotate(X_rot2, Y_rot2, P_ANGLE2 * i)
-        X_final, Y_final = transformations.translate(X_temp, Y_temp, x_offset + center_dist, y_offset)
-        ax.plot(X_final, Y_final, '-', linewidth=1.5, color='red')
+    with profiler.span('png.pattern'):
+        patterned = transformations.pattern_gear_pair(gear1_data, gear2_data, center_dist, x_offset, y_offset)
 
-    # Set plot limits for a good view
-    ax.set_xlim(-m_val * z1_val / 1.5, center_dist + m_val * z2_val / 1.5)
-    ax.set_ylim(-m_val * max(z1_val, z2_val) * 1.2, m_val * max(z1_val, z2_val) * 1.2)
-
-    # Save the figure
-    output_path = os.path.join(working_dir, 'Result1.png')
+    # Save via a temporary file so a failed save leaves no partial output
+    output_path = os.path.join(working_dir, PNG_FILENAME)
     try:
-        fig.savefig(output_path, dpi=100)
+        with atomic_output_path(output_path) as tmp_path:
+            write_gear_pair_image(tmp_path, patterned, center_dist, m_val, z1_val, z2_val)
     except Exception as e:
         print(f"Error saving image: {e}")
-    finally:
-        plt.close(fig) # Ensure the figure is closed to free memory
\ No newline at end of file
@@ -9,23 +9,30 @@ import os
 try:
     from .gui.fgpg_gui import GearApp
     from .core import gear_core
-    from .io import dxf_exporter, image_exporter
-    from .utils import config_manager
+    from .io import export_pipeline
+    from .service import http_server
+    from .utils import config_manager, profiler
 except ImportError:
     print("Error: Failed to import application modules.", file=sys.stderr)
     print("Please run this script as a module from the project's parent directory.", file=sys.stderr)
     print("Example: python -m fine_gear_profile_generator.main", file=sys.stderr)
     sys.exit(1)
 
-def run_headless_mode():
+DEFAULT_EXPORTERS = ('png', 'dxf')
+
+def run_headless_mode(exporters=DEFAULT_EXPORTERS):
     """
     Runs the gear generation process with a default set of parameters,
     saving the output files without launching the GUI.
+
+    Args:
+        exporters (sequence): Names of the registered exporters to run concurrently.
     """
     print("Running in headless mode with default parameters...")
 
-    config_data = config_manager.load_app_config()
-    params = config_manager.get_default_calculation_params(config_data)
+    with profiler.span('main.load_config'):
+        config_data = config_manager.load_app_config()
+        params = config_manager.get_default_calculation_params(config_data)
 
     working_dir_default = config_manager.get_default_working_directory(config_data)
     if os.path.isabs(working_dir_default):
@@ -35,29 +42,11 @@ def run_headless_mode():
     os.makedirs(working_dir, exist_ok=True)
 
     try:
-        result = gear_core.generate_gear_pair(params)
-        analysis = result['analysis']
+        with profiler.span('main.generate_gear_pair'):
+            result = gear_core.generate_gear_pair(params)
 
-        image_exporter.export_gear_pair_to_image(
-            working_dir,
-            result['gear1']['profile'],
-            result['gear2']['profile'],
-            analysis['center_distance'],
-            params['M'],
-            params['Z'],
-            params['z2'],
-            params.get('X_0', 0.0),
-            params.get('Y_0', 0.0)
-        )
-
-        dxf_exporter.export_gear_pair_to_dxf(
-            working_dir,
-            result['gear1']['profile'],
-            result['gear2']['profile'],
-            analysis['center_distance'],
-            params.get('X_0', 0.0),
-            params.get('Y_0', 0.0)
-        )
+        with profiler.span('main.export', exporters=list(exporters)):
+            export_pipeline.run_exporters(exporters, working_dir, result, params)
 
         print(f"Headless run complete. Files saved in {working_dir}")
 
@@ -79,13 +68,57 @@ def main():
         action='store_true',
         help='Run the application in headless mode without a GUI.'
     )
+    parser.add_argument(
+        '--exporters',
+        default=','.join(DEFAULT_EXPORTERS),
+        help=f"Comma-separated exporters to run in headless mode "
+             f"(available: {', '.join(export_pipeline.available_exporters())}; default: %(default)s)."
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Run the local HTTP service instead of the GUI.'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Address the HTTP service binds to.')
+    parser.add_argument('--port', type=int, default=8020, help='Port the HTTP service listens on.')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for the HTTP service.')
+    parser.add_argument(
+        '--max-pending',
+        type=int,
+        default=64,
+        help='Distinct computations the HTTP service accepts before answering 503.'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='OUT_JSON',
+        help='Record per-stage timings and counters to OUT_JSON in Chrome trace-event format.'
+    )
     # Future arguments for headless mode would be defined here.
     # e.g., parser.add_argument('--module', type=float, help='Set the gear module.')
 
     args = parser.parse_args()
+    args.exporters = [name.strip() for name in args.exporters.split(',') if name.strip()]
+    unknown = [name for name in args.exporters if name not in export_pipeline.available_exporters()]
+    if unknown:
+        parser.error(f"unknown exporter(s): {', '.join(unknown)}")
+
+    if args.profile:
+        profiler.enable()
+    try:
+        run_app(args)
+    finally:
+        tracer = profiler.disable()
+        if tracer is not None:
+            tracer.save(args.profile)
+            print(f"Profile written to {args.profile}")
 
-    if args.headless:
-        run_headless_mode()
+def run_app(args):
+    """Runs the headless pipeline, the HTTP service or the GUI according to the parsed arguments."""
+    if args.serve:
+        http_server.serve(args.host, args.port, args.workers, args.max_pending)
+    elif args.headless:
+        with profiler.span('main.run_headless_mode'):
+            run_headless_mode(args.exporters)
     else:
         # Launch the GUI application
         try:
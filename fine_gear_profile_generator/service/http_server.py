@@ -0,0 +1,433 @@
+"""
+Local asyncio HTTP service for the Fine Gear Profile Generator.
+
+Endpoints accept GET with a query string or POST with a JSON object body:
+
+    /analysis  contact ratio, center distance and undercut status (JSON)
+    /dxf       gear pair drawing, streamed with chunked transfer encoding
+    /png       gear pair preview image
+    /points    patterned outlines of both gears (JSON)
+    /health    load and coalescing statistics (JSON)
+
+Parameters use the calculation names (M, Z, z2, X, x2, ...); missing ones fall
+back to DEFAULT_PARAMS. Geometry and exports run in a worker pool, concurrent
+identical requests share one computation, and new computations are rejected with
+503 once `max_pending` are in flight. The DXF worker writes its document to a
+temporary file that is streamed to every client sharing it and then removed, so
+the drawing is never held in memory as a whole. Start it with:
+
+    python -m fine_gear_profile_generator.main --serve --port 8020
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import math
+import os
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from ..core import gear_core, transformations
+from ..io import dxf_exporter, image_exporter
+
+DEFAULT_PARAMS = {
+    'M': 1.0, 'Z': 25, 'z2': 36, 'ALPHA': 20.0, 'X': 0.2, 'x2': 0.0,
+    'B': 0.05, 'A': 1.0, 'D': 1.25, 'C': 0.2, 'E': 0.1, 'X_0': 0.0, 'Y_0': 0.0,
+    'SEG_INVOLUTE': 15, 'SEG_EDGE_R': 15, 'SEG_ROOT_R': 15, 'SEG_OUTER': 5, 'SEG_ROOT': 5,
+}
+INT_PARAMS = ('Z', 'z2', 'SEG_INVOLUTE', 'SEG_EDGE_R', 'SEG_ROOT_R', 'SEG_OUTER', 'SEG_ROOT')
+SEGMENT_PARAMS = INT_PARAMS[2:]
+FLOAT_PARAMS = ('M', 'ALPHA', 'X', 'x2', 'B', 'A', 'D', 'C', 'E', 'X_0', 'Y_0')
+# Accepted range of each float parameter (inclusive); far beyond any real gear, but
+# small enough that no intermediate result overflows
+FLOAT_LIMITS = {
+    'M': (0.001, 100.0), 'ALPHA': (1.0, 45.0), 'X': (-5.0, 5.0), 'x2': (-5.0, 5.0), 'B': (-1.0, 1.0),
+    'A': (0.0, 5.0), 'D': (0.0, 5.0), 'C': (0.0, 2.0), 'E': (0.0, 2.0), 'X_0': (-1e6, 1e6), 'Y_0': (-1e6, 1e6),
+}
+
+# Work budget of one request in outline points: (|Z| + |z2|) teeth of about
+# 2 * sum(SEG_*) points each. 4M points is a few seconds of work and ~64 MB of geometry.
+MAX_POINTS = 4_000_000
+MAX_BODY_BYTES = 64 * 1024
+MAX_HEADER_LINES = 100
+KEEP_ALIVE_TIMEOUT = 30.0
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    """An error that is reported to the client with the given status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def parse_params(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Merges request values over DEFAULT_PARAMS, converting and validating their types."""
+    params = dict(DEFAULT_PARAMS)
+    for key, value in values.items():
+        try:
+            if key in INT_PARAMS:
+                number = float(value)
+                if not number.is_integer():
+                    raise ValueError(value)
+                params[key] = int(number)
+            elif key in FLOAT_PARAMS:
+                number = float(value)
+                if not math.isfinite(number):
+                    raise ValueError(value)
+                params[key] = number
+            else:
+                raise HTTPError(400, f"Unknown parameter '{key}'")
+        except (TypeError, ValueError):
+            raise HTTPError(400, f"Invalid value for '{key}': {value!r}") from None
+
+    for key, (low, high) in FLOAT_LIMITS.items():
+        if not low <= params[key] <= high:
+            raise HTTPError(400, f"{key} must be between {low:g} and {high:g}, got {params[key]:g}")
+    for key in ('Z', 'z2'):
+        if params[key] == 0:
+            raise HTTPError(400, f"{key} must be non-zero")
+    if params['Z'] + params['z2'] == 0:
+        raise HTTPError(400, "Z + z2 must be non-zero (an internal gear needs more teeth than its pinion)")
+    for key in SEGMENT_PARAMS:
+        if params[key] < 2:
+            raise HTTPError(400, f"{key} must be at least 2")
+    points = estimated_points(params)
+    if points > MAX_POINTS:
+        raise HTTPError(400, f"Request would generate about {points} outline points, more than the "
+                             f"limit of {MAX_POINTS}; reduce the tooth or segment counts")
+    return params
+
+
+def estimated_points(params: Dict[str, Any]) -> int:
+    """Upper estimate of the outline points of both gears, the unit of the work budget."""
+    return (abs(params['Z']) + abs(params['z2'])) * 2 * sum(params[key] for key in SEGMENT_PARAMS)
+
+
+# --- Worker functions (module level so they can run in a process pool) ---
+
+def _patterned(params: Dict[str, Any]):
+    result = gear_core.generate_gear_pair(params)
+    patterned = transformations.pattern_gear_pair(
+        result['gear1']['profile'], result['gear2']['profile'],
+        result['analysis']['center_distance'], params['X_0'], params['Y_0']
+    )
+    return result, patterned
+
+
+def compute_analysis(params: Dict[str, Any]) -> bytes:
+    result = gear_core.generate_gear_pair(params)
+    return json.dumps({
+        'contact_ratio': float(result['analysis']['contact_ratio']),
+        'center_distance': float(result['analysis']['center_distance']),
+        'gear1_undercut_status': result['gear1']['undercut_status'],
+        'gear2_undercut_status': result['gear2']['undercut_status'],
+    }, allow_nan=False).encode('utf-8')
+
+
+def render_dxf(params: Dict[str, Any]) -> str:
+    """Writes the drawing to a temporary file and returns its path; the caller removes it."""
+    _, patterned = _patterned(params)
+    doc = dxf_exporter.build_gear_pair_document(patterned)
+    fd, path = tempfile.mkstemp(prefix='fgpg_', suffix='.dxf')
+    os.close(fd)
+    try:
+        doc.saveas(path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def render_png(params: Dict[str, Any]) -> bytes:
+    result, patterned = _patterned(params)
+    stream = io.BytesIO()
+    image_exporter.write_gear_pair_image(
+        stream, patterned, result['analysis']['center_distance'],
+        params['M'], params['Z'], params['z2']
+    )
+    return stream.getvalue()
+
+
+def compute_points(params: Dict[str, Any]) -> bytes:
+    _, patterned = _patterned(params)
+    document = {
+        f'gear{index}': [[X.tolist(), Y.tolist()] for X, Y in zip(all_X, all_Y)]
+        for index, (all_X, all_Y) in enumerate(patterned, start=1)
+    }
+    return json.dumps(document, allow_nan=False).encode('utf-8')
+
+
+# path -> (worker, content type, spooled: the worker returns the path of a temporary file)
+ROUTES: Dict[str, Tuple[Callable[[Dict[str, Any]], Union[bytes, str]], str, bool]] = {
+    '/analysis': (compute_analysis, 'application/json', False),
+    '/dxf': (render_dxf, 'application/dxf', True),
+    '/png': (render_png, 'image/png', False),
+    '/points': (compute_points, 'application/json', False),
+}
+
+
+class GearService:
+    """
+    Serves gear computations over HTTP/1.1 with keep-alive.
+
+    Args:
+        executor: Worker pool for the computations (defaults to a process pool).
+        workers: Size of the default process pool.
+        max_pending: Distinct computations allowed in flight before new ones get 503.
+        chunk_size: Chunk size for streamed responses.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, workers: Optional[int] = None,
+                 max_pending: int = 64, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._owns_executor = executor is None
+        self.executor = executor or ProcessPoolExecutor(max_workers=workers)
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # Requests currently using each computation, so spooled files outlive every reader
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.stats = {'requests': 0, 'computations': 0, 'coalesced': 0, 'rejected': 0}
+
+    def close(self) -> None:
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+    @asynccontextmanager
+    async def compute(self, path: str, params: Dict[str, Any]) -> AsyncIterator[Union[bytes, str]]:
+        """
+        Runs the worker for `path`, sharing the result with identical in-flight requests.
+
+        The result is valid inside the `async with` block; a spooled file is removed
+        once every request sharing it has left its block. Worker errors are raised as
+        HTTPError (400 for parameters that describe no valid gear pair, else 500).
+        """
+        key = (path, json.dumps(params, sort_keys=True))
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+        else:
+            if len(self._inflight) >= self.max_pending:
+                self.stats['rejected'] += 1
+                raise HTTPError(503, "Server busy, retry later")
+            worker = ROUTES[path][0]
+            future = asyncio.get_running_loop().run_in_executor(self.executor, worker, params)
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._finish(key, f))
+            self.stats['computations'] += 1
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            try:
+                # Shield so a disconnecting client does not cancel a computation others wait on.
+                result = await asyncio.shield(future)
+            except (ValueError, ArithmeticError) as e:
+                # Parameters that pass parse_params but describe no valid gear pair
+                # (e.g. NaN results, which JSON cannot carry)
+                raise HTTPError(400, f"Invalid gear parameters: {e}") from None
+            except Exception as e:
+                raise HTTPError(500, f"Computation failed: {e}") from None
+            yield result
+        finally:
+            self._leave(key, future)
+
+    def _leave(self, key: Tuple[str, str], future: asyncio.Future) -> None:
+        count = self._waiters.pop(future) - 1
+        if count:
+            self._waiters[future] = count
+        elif future.done() and self._inflight.get(key) is not future:
+            self._discard(key[0], future)
+
+    def _finish(self, key: Tuple[str, str], future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not future.cancelled():
+            future.exception()  # Mark as retrieved even if every waiter went away
+        if future not in self._waiters:
+            self._discard(key[0], future)
+
+    @staticmethod
+    def _discard(path: str, future: asyncio.Future) -> None:
+        """Removes the temporary file of a finished spooled computation."""
+        if ROUTES[path][2] and not future.cancelled() and future.exception() is None:
+            with suppress(OSError):
+                os.remove(future.result())
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except HTTPError as e:
+                    await send_response(writer, e.status, _error_body(e.message), 'application/json', False)
+                    break
+                if request is None:
+                    break
+                if not await self.dispatch(request, writer):
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def dispatch(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> bool:
+        """Answers one request and returns whether the connection should be kept open."""
+        self.stats['requests'] += 1
+        keep_alive = request['keep_alive']
+        try:
+            if request['method'] not in ('GET', 'POST'):
+                raise HTTPError(405, f"Method {request['method']} not allowed")
+            path = request['path']
+            if path == '/health':
+                body = json.dumps(dict(self.stats, inflight=len(self._inflight))).encode('utf-8')
+                await send_response(writer, 200, body, 'application/json', keep_alive)
+                return keep_alive
+            if path not in ROUTES:
+                raise HTTPError(404, f"Unknown endpoint '{path}'")
+
+            values = dict(request['query'])
+            if request['body']:
+                try:
+                    payload = json.loads(request['body'])
+                except ValueError:
+                    raise HTTPError(400, "Request body is not valid JSON") from None
+                if not isinstance(payload, dict):
+                    raise HTTPError(400, "Request body must be a JSON object")
+                values.update(payload)
+            params = parse_params(values)
+
+            _, content_type, spooled = ROUTES[path]
+            async with self.compute(path, params) as result:
+                if spooled:
+                    await send_file_chunked(writer, 200, result, content_type, keep_alive, self.chunk_size)
+                else:
+                    await send_response(writer, 200, result, content_type, keep_alive)
+        except HTTPError as e:
+            extra = {'Retry-After': '1'} if e.status == 503 else None
+            await send_response(writer, e.status, _error_body(e.message), 'application/json', keep_alive, extra)
+        return keep_alive
+
+
+def _error_body(message: str) -> bytes:
+    return json.dumps({'error': message}).encode('utf-8')
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Reads one HTTP/1.1 request; returns None when the client closed the connection."""
+    try:
+        request_line = await reader.readline()
+    except ValueError:
+        # Longer than the stream limit (asyncio reports LimitOverrunError as ValueError)
+        raise HTTPError(400, "Request line too long") from None
+    if not request_line.strip():
+        return None
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line") from None
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise HTTPError(431, "Header line too long") from None
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(431, "Too many header lines")
+
+    try:
+        length = int(headers.get('content-length', 0))
+        if length < 0:
+            raise ValueError(length)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length") from None
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b''
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    url = urlsplit(target)
+    return {
+        'method': method.upper(), 'path': url.path, 'query': parse_qsl(url.query),
+        'headers': headers, 'body': body, 'keep_alive': keep_alive,
+    }
+
+
+def _base_headers(content_type: str, keep_alive: bool, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    headers = {'Content-Type': content_type, 'Connection': 'keep-alive' if keep_alive else 'close'}
+    if extra:
+        headers.update(extra)
+    return headers
+
+
+def _encode_head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def send_response(writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str,
+                        keep_alive: bool, extra: Optional[Dict[str, str]] = None) -> None:
+    headers = _base_headers(content_type, keep_alive, extra)
+    headers['Content-Length'] = str(len(body))
+    writer.write(_encode_head(status, headers) + body)
+    await writer.drain()
+
+
+async def send_file_chunked(writer: asyncio.StreamWriter, status: int, path: str, content_type: str,
+                            keep_alive: bool, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Streams a file with chunked transfer encoding, waiting for the socket to drain per chunk."""
+    headers = _base_headers(content_type, keep_alive)
+    headers['Transfer-Encoding'] = 'chunked'
+    writer.write(_encode_head(status, headers))
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            writer.write(f"{len(chunk):x}\r\n".encode('ascii') + chunk + b'\r\n')
+            await writer.drain()
+    writer.write(b'0\r\n\r\n')
+    await writer.drain()
+
+
+async def start_server(service: GearService, host: str = '127.0.0.1', port: int = 8020) -> asyncio.AbstractServer:
+    return await asyncio.start_server(service.handle_connection, host, port)
+
+
+async def _serve_forever(host: str, port: int, workers: Optional[int], max_pending: int) -> None:
+    service = GearService(workers=workers, max_pending=max_pending)
+    server = await start_server(service, host, port)
+    try:
+        addresses = ', '.join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+        print(f"Serving on {addresses}")
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def serve(host: str = '127.0.0.1', port: int = 8020, workers: Optional[int] = None, max_pending: int = 64) -> None:
+    """Runs the HTTP service until interrupted."""
+    try:
+        asyncio.run(_serve_forever(host, port, workers, max_pending))
+    except KeyboardInterrupt:
+        print("Server stopped.")
@@ -0,0 +1,141 @@
+"""
+Built-in load-test client for the HTTP service.
+
+Opens `concurrency` keep-alive connections, sends `requests` requests in total and
+reports p50/p99 latency and throughput. `--distinct N` cycles the tooth count over
+N values so the effect of request coalescing can be compared. Example:
+
+    python -m fine_gear_profile_generator.service.load_test http://127.0.0.1:8020/analysis -n 500 -c 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+    """Reads one HTTP/1.1 response, handling both Content-Length and chunked bodies."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        parts = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            parts.append(await reader.readexactly(size))
+            await reader.readline()
+        body = b''.join(parts)
+    else:
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers, body
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str,
+                  path: str, query: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, str], bytes]:
+    """Sends a GET request on an open connection and returns (status, headers, body)."""
+    target = f"{path}?{urlencode(query)}" if query else path
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    return await read_response(reader)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float('nan')
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+async def run_load_test(url: str, requests: int = 200, concurrency: int = 16, distinct: int = 1,
+                        base_query: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Runs the load test and returns latency statistics in milliseconds."""
+    parts = urlsplit(url)
+    host, port = parts.hostname or '127.0.0.1', parts.port or 80
+    base_query = dict(base_query or {})
+    base_z = int(base_query.get('Z', 25))
+    counter = iter(range(requests))
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    received = 0
+
+    async def worker() -> None:
+        nonlocal received
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for index in counter:
+                query = dict(base_query)
+                if distinct > 1:
+                    query['Z'] = base_z + index % distinct
+                start = time.perf_counter()
+                status, _, body = await request(reader, writer, parts.netloc, parts.path or '/', query)
+                latencies.append((time.perf_counter() - start) * 1000.0)
+                statuses[status] = statuses.get(status, 0) + 1
+                received += len(body)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, requests)))))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'elapsed_s': elapsed,
+        'throughput_rps': len(latencies) / elapsed if elapsed > 0 else float('nan'),
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': latencies[-1] if latencies else float('nan'),
+        'bytes_received': received,
+        'statuses': statuses,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure latency of the local gear HTTP service.")
+    parser.add_argument('url', help='Endpoint URL, e.g. http://127.0.0.1:8020/analysis')
+    parser.add_argument('-n', '--requests', type=int, default=200, help='Total number of requests.')
+    parser.add_argument('-c', '--concurrency', type=int, default=16, help='Number of concurrent connections.')
+    parser.add_argument('--distinct', type=int, default=1,
+                        help='Number of distinct parameter sets (1 means every request is identical).')
+    parser.add_argument('--param', action='append', default=[], metavar='KEY=VALUE',
+                        help='Extra request parameter (repeatable), e.g. --param z2=120.')
+    parser.add_argument('--json', action='store_true', help='Print the statistics as JSON.')
+    args = parser.parse_args(argv)
+
+    base_query = dict(item.split('=', 1) for item in args.param)
+    stats = asyncio.run(run_load_test(args.url, args.requests, args.concurrency, args.distinct, base_query))
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(f"{stats['requests']} requests, concurrency {stats['concurrency']}, "
+              f"{stats['elapsed_s']:.2f} s, {stats['throughput_rps']:.1f} req/s")
+        print(f"p50 {stats['p50_ms']:.2f} ms   p99 {stats['p99_ms']:.2f} ms   max {stats['max_ms']:.2f} ms")
+        print(f"statuses: {stats['statuses']}, {stats['bytes_received']} bytes received")
+    return 0 if set(stats['statuses']) == {200} else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
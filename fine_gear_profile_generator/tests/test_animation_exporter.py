@@ -0,0 +1,60 @@
+import unittest
+import os
+import shutil
+import sys
+
+import numpy as np
+from PIL import Image
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from fine_gear_profile_generator.core import gear_core
+from fine_gear_profile_generator.io import animation_exporter, export_pipeline
+from fine_gear_profile_generator.utils import profiler
+
+class TestAnimationExporter(unittest.TestCase):
+
+    def setUp(self):
+        """Set up an export job and a temporary directory for test files."""
+        self.temp_dir = "temp_test_animation"
+        os.makedirs(self.temp_dir, exist_ok=True)
+        params = {
+            'M': 1.0, 'Z': 18, 'z2': 36, 'ALPHA': 20.0, 'X': 0.2, 'x2': 0.0,
+            'B': 0.05, 'A': 1.0, 'D': 1.25, 'C': 0.2, 'E': 0.1, 'X_0': 0.0, 'Y_0': 0.0,
+            'SEG_INVOLUTE': 15, 'SEG_EDGE_R': 15, 'SEG_ROOT_R': 15,
+            'SEG_OUTER': 5, 'SEG_ROOT': 5
+        }
+        self.job = export_pipeline.build_export_job(gear_core.generate_gear_pair(params), params)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_gears_turn_in_ratio(self):
+        scene = animation_exporter.build_scene(self.job, frames=12)
+        self.assertAlmostEqual(scene['ratio'], -0.5)
+        # One pitch of gear 1 reproduces the first frame exactly
+        scene['step'] = 2 * np.pi / 18
+        first = np.asarray(animation_exporter.render_frame(scene, 0))
+        after_pitch = np.asarray(animation_exporter.render_frame(scene, 1))
+        self.assertGreater(np.count_nonzero(first), 0)
+        self.assertLess(np.count_nonzero(first != after_pitch), 0.001 * first.size)
+
+    def test_invalid_frames_and_turns_are_rejected(self):
+        for kwargs in ({'frames': 0}, {'frames': -4}, {'frames': 2.5}, {'turns': 0.0}, {'turns': -1.0}):
+            with self.assertRaises(ValueError, msg=kwargs):
+                animation_exporter.build_scene(self.job, **kwargs)
+
+    def test_gif_is_written_with_all_frames(self):
+        path = os.path.join(self.temp_dir, 'mesh.gif')
+        with profiler.profiling() as tracer:
+            animation_exporter.write_gear_pair_animation(path, self.job, fmt='gif', frames=8, width=200,
+                                                         max_workers=2)
+        self.assertEqual(tracer.counters['bytes_written'], os.path.getsize(path))
+        with Image.open(path) as image:
+            self.assertEqual(image.n_frames, 8)
+            self.assertEqual(image.size[0], 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from fine_gear_profile_generator.benchmarks import bench_hot_paths
+
+class TestBenchmarkCompare(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a baseline with a single case."""
+        self.baseline = {
+            'results': {
+                'case': {'time_s': 1.0, 'peak_mem_bytes': 1000, 'output_size': 50, 'output_unit': 'points'}
+            }
+        }
+
+    def _current(self, time_s=1.0, peak=1000, size=50):
+        return {'results': {'case': {'time_s': time_s, 'peak_mem_bytes': peak, 'output_size': size, 'output_unit': 'points'}}}
+
+    def test_within_threshold_is_not_flagged(self):
+        regressions = bench_hot_paths.compare(self.baseline, self._current(time_s=1.2, peak=1200), threshold=0.25)
+        self.assertEqual(regressions, [])
+
+    def test_slowdown_and_size_change_are_flagged(self):
+        regressions = bench_hot_paths.compare(self.baseline, self._current(time_s=2.0, size=60), threshold=0.25)
+        metrics = sorted(r['metric'] for r in regressions)
+        self.assertEqual(metrics, ['output_size', 'time_s'])
+
+    def test_noise_floor_ignores_microsecond_jitter(self):
+        baseline = {'results': {'case': {'time_s': 10e-6, 'peak_mem_bytes': 1000, 'output_size': 50, 'output_unit': 'points'}}}
+        self.assertEqual(bench_hot_paths.compare(baseline, self._current(time_s=25e-6), threshold=0.25), [])
+        regressions = bench_hot_paths.compare(baseline, self._current(time_s=25e-6), threshold=0.25, noise_floor=0)
+        self.assertEqual([r['metric'] for r in regressions], ['time_s'])
+        regressions = bench_hot_paths.compare(baseline, self._current(time_s=200e-6), threshold=0.25)
+        self.assertEqual([r['metric'] for r in regressions], ['time_s'])
+
+    def test_quick_matrix_skips_large_gears(self):
+        cases = bench_hot_paths.build_cases(quick=True)
+        self.assertTrue(cases)
+        for case in cases:
+            self.assertLessEqual(max(abs(case['z1']), abs(case['z2'])), bench_hot_paths.QUICK_LIMIT)
+
+    def test_single_case_records_all_metrics(self):
+        case = bench_hot_paths.build_cases(quick=True, only=['generate_tooth_profile'])[0]
+        result = bench_hot_paths.run_case(case, repeat=1)
+        self.assertGreater(result['time_s'], 0)
+        self.assertGreater(result['output_size'], 0)
+        self.assertIn('peak_mem_bytes', result)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import os
+import shutil
+import sys
+
+import numpy as np
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from fine_gear_profile_generator.core import gear_core
+from fine_gear_profile_generator.io import design_library
+
+LEGACY_INPUTS = os.path.join(os.path.dirname(__file__), '..', 'result', 'Inputs.dat')
+
+class TestDesignLibrary(unittest.TestCase):
+
+    def setUp(self):
+        """Set up an in-memory library and a temporary directory for file tests."""
+        self.temp_dir = "temp_test_library"
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self.library = design_library.DesignLibrary(':memory:')
+        self.params = {
+            'M': 1.0, 'Z': 18, 'z2': 36, 'ALPHA': 20.0, 'X': 0.2, 'x2': 0.0,
+            'B': 0.05, 'A': 1.0, 'D': 1.25, 'C': 0.2, 'E': 0.1, 'X_0': 0.0, 'Y_0': 0.0,
+            'SEG_INVOLUTE': 15, 'SEG_EDGE_R': 15, 'SEG_ROOT_R': 15,
+            'SEG_OUTER': 5, 'SEG_ROOT': 5
+        }
+
+    def tearDown(self):
+        self.library.close()
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_result_round_trip_with_geometry(self):
+        result = gear_core.generate_gear_pair(self.params)
+        design_id = self.library.add_result(self.params, result, name='pair', store_geometry=True)
+
+        design = self.library.get_design(design_id)
+        self.assertEqual(design['params'], self.params)
+        self.assertIsInstance(design['params']['Z'], int)
+        self.assertAlmostEqual(design['analysis']['contact_ratio'], float(result['analysis']['contact_ratio']))
+
+        gear1, gear2 = self.library.get_geometry(design_id)
+        np.testing.assert_array_equal(gear1[0], result['gear1']['profile'][0])
+        np.testing.assert_array_equal(gear2[1], result['gear2']['profile'][1])
+        self.assertEqual(gear2[2], result['gear2']['profile'][2])
+
+    def test_bulk_add_and_indexed_queries(self):
+        records = [
+            {'params': dict(self.params, Z=z, X=x / 10.0, M=m)}
+            for z in range(10, 60) for x in range(-5, 6) for m in (0.5, 1.0)
+        ]
+        self.assertEqual(self.library.bulk_add(records), len(records))
+
+        self.assertEqual(self.library.count_designs(module=0.5, z1=20), 11)
+        found = self.library.find_designs(z1=20, x1=(0.0, 0.3), module=1.0)
+        self.assertEqual(len(found), 4)
+        self.assertTrue(all(0.0 <= d['params']['X'] <= 0.3 for d in found))
+
+        self.assertEqual(self.library.count_designs(z2=36), len(records))
+        self.assertEqual(self.library.count_designs(x2=(-0.1, 0.1)), len(records))
+
+        def plan(**filters):
+            where, args = self.library._where(**dict(dict.fromkeys(
+                ('module', 'z1', 'z2', 'x1', 'x2', 'name', 'min_contact_ratio')), **filters))
+            rows = self.library.conn.execute(f'EXPLAIN QUERY PLAN SELECT * FROM designs{where}', args)
+            return ' '.join(str(row[-1]) for row in rows)
+
+        self.assertIn('idx_designs_teeth', plan(z1=20, z2=36))
+        # The mate's columns are filtered on their own as well
+        self.assertIn('idx_designs_mate_teeth', plan(z2=36))
+        self.assertIn('idx_designs_mate_shift', plan(x2=(-0.1, 0.1)))
+
+    def test_legacy_inputs_import_and_jsonl_export(self):
+        legacy_dir = os.path.join(self.temp_dir, 'job1')
+        os.makedirs(legacy_dir)
+        shutil.copy(LEGACY_INPUTS, os.path.join(legacy_dir, 'Inputs.dat'))
+
+        self.assertEqual(self.library.import_inputs_dat([self.temp_dir]), 1)
+        design = self.library.latest_design(os.path.abspath(legacy_dir))
+        self.assertEqual(design['params']['Z'], 25)
+        self.assertAlmostEqual(design['analysis']['center_distance'], 30.6954)
+
+        export_path = os.path.join(self.temp_dir, 'designs.jsonl')
+        self.assertEqual(self.library.export_jsonl(export_path), 1)
+        with design_library.DesignLibrary(':memory:') as other:
+            self.assertEqual(other.import_jsonl(export_path), 1)
+            self.assertEqual(other.find_designs()[0]['params'], design['params'])
+
+    def test_fractional_integer_params_are_rejected(self):
+        self.assertEqual(design_library.coerce_params({'Z': '18.0', 'M': '0.5'}), {'Z': 18, 'M': 0.5})
+        with self.assertRaises(ValueError):
+            design_library.coerce_params({'Z': 18.7})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import os
+import re
+import shutil
+import sys
+
+import numpy as np
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from fine_gear_profile_generator.core import gear_core
+from fine_gear_profile_generator.io import edm_exporter, export_pipeline
+from fine_gear_profile_generator.utils import profiler
+
+MOVE = re.compile(r'(G[0-3]) X(\S+) Y(\S+)(?: I(\S+) J(\S+))?')
+
+def _distance_to_polygon(points, polygon):
+    """Smallest distance from each point to the closed polygon's edges."""
+    a = polygon
+    ab = np.roll(polygon, -1, axis=0) - a
+    ap = points[:, None, :] - a[None]
+    t = np.clip((ap * ab[None]).sum(-1) / (ab * ab).sum(-1)[None], 0, 1)
+    return np.hypot(*(ap - t[..., None] * ab[None]).transpose(2, 0, 1)).min(axis=1)
+
+class TestEdmExporter(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a small gear pair and a temporary directory for test files."""
+        self.temp_dir = "temp_test_edm"
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self.params = {
+            'M': 0.3, 'Z': 18, 'z2': -40, 'ALPHA': 20.0, 'X': 0.2, 'x2': 0.0,
+            'B': 0.05, 'A': 1.0, 'D': 1.25, 'C': 0.2, 'E': 0.1, 'X_0': 0.0, 'Y_0': 0.0,
+            'SEG_INVOLUTE': 15, 'SEG_EDGE_R': 15, 'SEG_ROOT_R': 15,
+            'SEG_OUTER': 5, 'SEG_ROOT': 5
+        }
+        self.result = gear_core.generate_gear_pair(self.params)
+        self.job = export_pipeline.build_export_job(self.result, self.params)
+
+    def tearDown(self):
+        """Remove the temporary directory and its contents after the test."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_square_offsets_outwards_and_inwards(self):
+        square = np.array([[0.0, 0.0], [2.0, 0.0], [2.0, 2.0], [0.0, 2.0]])
+        grown = edm_exporter.offset_contour(square, 0.1, outward=True)
+        shrunk = edm_exporter.offset_contour(square[::-1], 0.1, outward=False)
+        np.testing.assert_allclose(grown, [[-0.1, -0.1], [2.1, -0.1], [2.1, 2.1], [-0.1, 2.1]])
+        np.testing.assert_allclose(sorted(map(tuple, shrunk)), [[0.1, 0.1], [0.1, 1.9], [1.9, 0.1], [1.9, 1.9]])
+
+    def test_loops_at_tight_roots_are_removed(self):
+        """With the wire thicker than the root fillets, the path still keeps the full offset everywhere."""
+        params = dict(self.params, M=0.1)
+        job = export_pipeline.build_export_job(gear_core.generate_gear_pair(params), params)
+        offset = 0.065
+        for gear, internal, center in ((1, False, (0.0, 0.0)), (2, True, (job['center_distance'], 0.0))):
+            all_X, all_Y = job['patterned'][gear - 1]
+            contour = edm_exporter.closed_contour(all_X, all_Y)
+            toolpath = edm_exporter.gear_toolpath(all_X, all_Y, center, internal, offset)
+            self.assertEqual(toolpath.copies, len(all_X))
+            raw = edm_exporter.offset_contour(contour, offset, outward=not internal)
+            self.assertLess((len(toolpath.points) - 1) * toolpath.copies, len(raw))
+            distance = _distance_to_polygon(toolpath.points, contour)
+            self.assertGreater(distance.min(), offset - 1e-9)
+            self.assertLess(distance.max(), offset + 1e-3)
+
+    def test_program_follows_offset_within_tolerance(self):
+        path = os.path.join(self.temp_dir, edm_exporter.EDM_FILENAME)
+        tolerance = 0.001
+        moves = edm_exporter.write_gear_pair_edm(path, self.job, wire_diameter=0.1, spark_gap=0.015,
+                                                 tolerance=tolerance, decimals=5)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual((lines[0], lines[-2], lines[-1]), ('%', 'M30', '%'))
+        self.assertEqual(lines.count('M00'), 2)
+        feeds = [line for line in lines if ' F' in line]
+        self.assertEqual(len(feeds), 2)
+        self.assertTrue(all(line.endswith(f" F{edm_exporter.DEFAULT_FEED:.5f}") for line in feeds))
+
+        sections = [line for line in lines if line.startswith('(GEAR')]
+        self.assertEqual(len(sections), 2)
+        self.assertIn('INTERNAL', sections[1])
+
+        contours, position, arcs = [], None, 0
+        for line in lines:
+            match = MOVE.match(line)
+            if line.startswith('(GEAR'):
+                contours.append([])
+            if not match:
+                continue
+            code, end = match.group(1), np.array([float(match.group(2)), float(match.group(3))])
+            if code in ('G2', 'G3'):
+                center = position + np.array([float(match.group(4)), float(match.group(5))])
+                self.assertAlmostEqual(np.hypot(*(end - center)), np.hypot(*(position - center)), places=4)
+                arcs += 1
+            contours[-1].append(end)
+            position = end
+        self.assertGreater(arcs, 0)
+        self.assertEqual(sum(len(c) - 3 for c in contours), moves)  # minus lead-in, entry and lead-out
+
+        offset = 0.065
+        for gear, points in enumerate(contours, start=1):
+            points = np.array(points[1:-1])
+            np.testing.assert_allclose(points[0], points[-1], atol=1e-4)  # the contour is closed
+            outline = edm_exporter.closed_contour(*self.job['patterned'][gear - 1])
+            distance = _distance_to_polygon(points, outline)
+            self.assertGreater(distance.min(), offset - tolerance - 1e-5)
+            self.assertLess(distance.max(), offset + tolerance + 1e-5)
+
+    def test_tooth_pitch_checks_every_copy(self):
+        center = np.array([1.0, -2.0])
+        angles = np.linspace(0, 2 * np.pi, 40, endpoint=False)
+        radius = 1 + 0.1 * (np.arange(40) % 4 == 0)
+        points = center + np.column_stack((np.cos(angles), np.sin(angles))) * radius[:, None]
+        pitch = edm_exporter._tooth_pitch(points, 4, 10, center, atol=1e-9)
+        self.assertAlmostEqual(pitch, 2 * np.pi / 10)
+        # A deviation in a middle copy (neither the second nor the last) is caught
+        points[5 * 4 + 2] += 1e-6
+        self.assertIsNone(edm_exporter._tooth_pitch(points, 4, 10, center, atol=1e-9))
+
+    def test_registered_in_export_pipeline(self):
+        with profiler.profiling() as tracer:
+            outputs = export_pipeline.run_exporters(['edm'], self.temp_dir, self.result, self.params)
+        self.assertTrue(os.path.getsize(outputs['edm']) > 0)
+        self.assertEqual(os.listdir(self.temp_dir), [edm_exporter.EDM_FILENAME])
+        self.assertEqual(tracer.counters['bytes_written'], os.path.getsize(outputs['edm']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import os
+import shutil
+import stat
+import sys
+from unittest import mock
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from fine_gear_profile_generator.core import gear_core
+from fine_gear_profile_generator.io import atomic_writer, export_pipeline
+from fine_gear_profile_generator.utils import profiler
+
+def _failing_exporter(output_path, job):
+    with open(output_path, 'w') as f:
+        f.write('partial')
+    raise IOError("disk full")
+
+class TestExportPipeline(unittest.TestCase):
+
+    def setUp(self):
+        """Set up gear pair parameters and a temporary directory for test files."""
+        self.temp_dir = "temp_test_export"
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self.params = {
+            'M': 1.0, 'Z': 18, 'z2': 36, 'ALPHA': 20.0, 'X': 0.2, 'x2': 0.0,
+            'B': 0.05, 'A': 1.0, 'D': 1.25, 'C': 0.2, 'E': 0.1, 'X_0': 0.0, 'Y_0': 0.0,
+            'SEG_INVOLUTE': 15, 'SEG_EDGE_R': 15, 'SEG_ROOT_R': 15,
+            'SEG_OUTER': 5, 'SEG_ROOT': 5
+        }
+        self.result = gear_core.generate_gear_pair(self.params)
+
+    def tearDown(self):
+        """Remove the temporary directory and its contents after the test."""
+        export_pipeline._REGISTRY.pop('failing', None)
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_png_and_dxf_are_written_concurrently(self):
+        outputs = export_pipeline.run_exporters(['png', 'dxf'], self.temp_dir, self.result, self.params)
+
+        self.assertEqual(set(outputs), {'png', 'dxf'})
+        for path in outputs.values():
+            self.assertTrue(os.path.getsize(path) > 0, f"{path} is empty.")
+        # Only the final files remain; no temporary files are left behind.
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ['Result1.png', 'Result_Gear_Pair.dxf'])
+
+    def test_process_exporter_spans_reach_the_parent_trace(self):
+        with profiler.profiling() as tracer:
+            outputs = export_pipeline.run_exporters(['png', 'dxf'], self.temp_dir, self.result, self.params)
+
+        spans = [event for event in tracer.events if event['ph'] == 'X']
+        png_spans = [event for event in spans if event['name'].startswith('png.')]
+        self.assertTrue(png_spans)
+        self.assertNotEqual(png_spans[0]['pid'], os.getpid())
+        runs = {event['args']['exporter'] for event in spans if event['name'] == 'export.run'}
+        self.assertEqual(runs, {'png', 'dxf'})
+        self.assertEqual(tracer.counters['bytes_written'], sum(os.path.getsize(p) for p in outputs.values()))
+
+    def test_failed_export_keeps_previous_file(self):
+        export_pipeline.register_exporter('failing', _failing_exporter, 'failing.txt')
+        target = os.path.join(self.temp_dir, 'failing.txt')
+        with open(target, 'w') as f:
+            f.write('previous')
+
+        with self.assertRaises(RuntimeError):
+            export_pipeline.run_exporters(['failing', 'dxf'], self.temp_dir, self.result, self.params)
+
+        with open(target) as f:
+            self.assertEqual(f.read(), 'previous')
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'Result_Gear_Pair.dxf')))
+        self.assertEqual(len(os.listdir(self.temp_dir)), 2)
+
+    def test_atomic_output_is_synced_and_gets_the_default_mode(self):
+        target = os.path.join(self.temp_dir, 'out.txt')
+        plain = os.path.join(self.temp_dir, 'plain.txt')
+        open(plain, 'w').close()
+        synced = []
+        real_fsync = os.fsync
+
+        def fsync(fd):
+            synced.append(stat.S_ISDIR(os.fstat(fd).st_mode))
+            real_fsync(fd)
+
+        with mock.patch.object(atomic_writer.os, 'fsync', fsync):
+            with atomic_writer.atomic_output_path(target) as tmp_path:
+                with open(tmp_path, 'w') as f:
+                    f.write('data')
+
+        # The file is flushed before the rename, then the directory entry after it
+        self.assertEqual(synced, [False, True] if hasattr(os, 'O_DIRECTORY') else [False])
+        self.assertEqual(stat.S_IMODE(os.stat(target).st_mode), stat.S_IMODE(os.stat(plain).st_mode))
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ['out.txt', 'plain.txt'])
+
+    def test_unknown_exporter_is_rejected(self):
+        with self.assertRaises(ValueError):
+            export_pipeline.run_exporters(['svg'], self.temp_dir, self.result, self.params)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+import asyncio
+import json
+import glob
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from fine_gear_profile_generator.service import http_server, load_test
+
+class TestHttpService(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a service backed by a thread pool so the test stays light."""
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.service = http_server.GearService(executor=self.executor, chunk_size=4096)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def _run(self, scenario):
+        async def runner():
+            server = await http_server.start_server(self.service, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                return await scenario(port)
+            finally:
+                server.close()
+                await server.wait_closed()
+        return asyncio.run(runner())
+
+    def test_endpoints_respond(self):
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                host = f'127.0.0.1:{port}'
+                analysis = await load_test.request(reader, writer, host, '/analysis', {'Z': 18, 'z2': 36})
+                dxf = await load_test.request(reader, writer, host, '/dxf', {'Z': 18, 'z2': 36})
+                png = await load_test.request(reader, writer, host, '/png')
+                bad = await load_test.request(reader, writer, host, '/analysis', {'Q': 1})
+                return analysis, dxf, png, bad
+            finally:
+                writer.close()
+                await writer.wait_closed()
+
+        analysis, dxf, png, bad = self._run(scenario)
+        self.assertEqual(analysis[0], 200)
+        self.assertGreater(json.loads(analysis[2])['contact_ratio'], 1.0)
+        self.assertEqual(dxf[0], 200)
+        self.assertEqual(dxf[1]['transfer-encoding'], 'chunked')
+        self.assertGreater(len(dxf[2]), 4096)
+        self.assertIn(b'LWPOLYLINE', dxf[2])
+        self.assertEqual(png[0], 200)
+        self.assertTrue(png[2].startswith(b'\x89PNG'))
+        self.assertEqual(bad[0], 400)
+
+    def test_non_finite_and_degenerate_parameters_are_rejected(self):
+        for values in ({'X': 'nan'}, {'M': 'inf'}, {'ALPHA': float('-inf')}, {'Z': 20, 'z2': -20},
+                       {'M': 1e300}, {'M': 0}, {'ALPHA': 90}, {'x2': -1e12}, {'Y_0': 1e300}):
+            with self.assertRaises(http_server.HTTPError, msg=values) as caught:
+                http_server.parse_params(values)
+            self.assertEqual(caught.exception.status, 400)
+
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                return await load_test.request(reader, writer, f'127.0.0.1:{port}', '/analysis', {'x2': 'NaN'})
+            finally:
+                writer.close()
+                await writer.wait_closed()
+
+        status, _, body = self._run(scenario)
+        self.assertEqual(status, 400)
+        self.assertIn('x2', json.loads(body)['error'])
+
+    def test_malformed_requests_get_client_errors(self):
+        oversized = b'x' * (2 ** 16 + 1)
+        requests = {
+            b'GET /analysis HTTP/1.1\r\nContent-Length: -5\r\n\r\n': 400,
+            b'GET /' + oversized + b' HTTP/1.1\r\n\r\n': 400,
+            b'GET /analysis HTTP/1.1\r\nX-Long: ' + oversized + b'\r\n\r\n': 431,
+            b'GET /analysis?M=1e300 HTTP/1.1\r\n\r\n': 400,
+        }
+
+        async def send_raw(port, data):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                writer.write(data)
+                await writer.drain()
+                return (await load_test.read_response(reader))[0]
+            finally:
+                writer.close()
+                await writer.wait_closed()
+
+        async def scenario(port):
+            return [await send_raw(port, data) for data in requests]
+
+        self.assertEqual(self._run(scenario), list(requests.values()))
+
+    def test_work_budget_caps_teeth_times_segments(self):
+        # Each limit alone is moderate; together they exceed the budget
+        self.assertLessEqual(http_server.estimated_points(http_server.parse_params({'Z': 15000, 'z2': 15000})),
+                             http_server.MAX_POINTS)
+        http_server.parse_params({'SEG_INVOLUTE': 1000})
+        oversized = {'Z': 15000, 'z2': 15000, 'SEG_INVOLUTE': 1000}
+
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                return await load_test.request(reader, writer, f'127.0.0.1:{port}', '/dxf', oversized)
+            finally:
+                writer.close()
+                await writer.wait_closed()
+
+        status, _, body = self._run(scenario)
+        self.assertEqual(status, 400)
+        self.assertIn(str(http_server.MAX_POINTS), json.loads(body)['error'])
+        self.assertEqual(self.service.stats['computations'], 0)
+
+    def test_identical_requests_are_coalesced(self):
+        spooled = os.path.join(tempfile.gettempdir(), 'fgpg_*.dxf')
+        before = set(glob.glob(spooled))
+
+        async def scenario(port):
+            return await load_test.run_load_test(f'http://127.0.0.1:{port}/dxf', requests=8, concurrency=8)
+
+        stats = self._run(scenario)
+        self.assertEqual(stats['statuses'], {200: 8})
+        self.assertLess(self.service.stats['computations'], 8)
+        self.assertGreater(self.service.stats['coalesced'], 0)
+        # Every spooled drawing is removed once all requests sharing it were answered
+        self.assertEqual(set(glob.glob(spooled)) - before, set())
+        self.assertEqual(self.service._waiters, {})
+
+    def test_spooled_file_is_removed_when_every_waiter_left_early(self):
+        params = http_server.parse_params({'Z': 19})
+
+        async def scenario():
+            async def use():
+                async with self.service.compute('/dxf', params):
+                    pass
+
+            task = asyncio.ensure_future(use())
+            await asyncio.sleep(0)
+            future = next(iter(self.service._inflight.values()))
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual(self.service._waiters, {})
+            return await future
+
+        path = asyncio.run(scenario())
+        self.assertFalse(os.path.exists(path))
+
+    def test_admission_control_rejects_when_full(self):
+        self.service.max_pending = 1
+
+        async def scenario(port):
+            return await load_test.run_load_test(f'http://127.0.0.1:{port}/analysis', requests=6,
+                                                 concurrency=6, distinct=6)
+
+        stats = self._run(scenario)
+        self.assertIn(503, stats['statuses'])
+        self.assertGreater(self.service.stats['rejected'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from fine_gear_profile_generator.core import geometry_generator, transformations
+from fine_gear_profile_generator.gui.preview_canvas import OutlinePyramid
+
+class TestOutlinePyramid(unittest.TestCase):
+
+    def setUp(self):
+        """Set up the pyramid of a 1000-tooth ring gear."""
+        profile = geometry_generator.generate_tooth_profile(
+            M=1.0, Z=-1000, ALPHA=20.0, X=0.0, B=0.0, A=1.0, D=1.25, C=0.25, E=0.1,
+            SEG_INVOLUTE=30, SEG_EDGE_R=15, SEG_ROOT_R=15, SEG_OUTER=5, SEG_ROOT=5
+        )
+        X_tooth, Y_tooth, Z, P_ANGLE, ALIGN_ANGLE = profile
+        self.all_X, self.all_Y = transformations.create_circular_pattern(X_tooth, Y_tooth, Z, P_ANGLE, ALIGN_ANGLE)
+        self.pyramid = OutlinePyramid(self.all_X, self.all_Y)
+        self.full_points = sum(len(x) for x in self.all_X)
+
+    def test_whole_gear_uses_a_coarse_level(self):
+        x_min, y_min, x_max, y_max = self.pyramid.bounds
+        pixels_per_unit = 500 / (x_max - x_min)
+        level, polylines = self.pyramid.select(self.pyramid.bounds, pixels_per_unit)
+
+        self.assertGreater(level, 0)
+        self.assertEqual(len(polylines), 1)
+        self.assertLess(len(polylines[0]), self.full_points / 4)
+
+    def test_zoomed_tooth_is_culled_at_full_detail(self):
+        bounds = self.pyramid.tooth_bounds[0]
+        view = (bounds[0], bounds[1], bounds[2], bounds[3])
+        level, polylines = self.pyramid.select(view, 500 / (bounds[2] - bounds[0]))
+
+        self.assertEqual(level, 0)
+        drawn = sum(len(p) for p in polylines)
+        self.assertLessEqual(drawn, 5 * len(self.all_X[0]))
+        # Tooth 0 is drawn with its original points
+        first_tooth = np.column_stack((self.all_X[0], self.all_Y[0]))
+        self.assertTrue(any(np.any(np.all(np.isclose(p, first_tooth[5]), axis=1)) for p in polylines))
+
+    def test_runs_wrap_around_the_gear(self):
+        visible = np.zeros(self.pyramid.tooth_count, dtype=bool)
+        visible[[0, 1, -1]] = True
+        self.pyramid.visible_teeth = lambda view: visible
+        _, polylines = self.pyramid.select(self.pyramid.bounds, 1e6)
+        self.assertEqual(len(polylines), 1)
+        self.assertEqual(len(polylines[0]), 3 * len(self.all_X[0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from fine_gear_profile_generator.core import geometry_generator, profile_templates
+from fine_gear_profile_generator.utils import config_manager
+
+SEGMENTS = (15, 15, 15, 5, 5)
+
+class TestProfileTemplates(unittest.TestCase):
+
+    def assertProfilesClose(self, actual, expected):
+        np.testing.assert_allclose(actual[0], expected[0], rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(actual[1], expected[1], rtol=1e-12, atol=1e-12)
+        self.assertEqual(actual[2:], expected[2:])
+
+    def test_scaled_template_matches_direct_generation(self):
+        """Scaling the unit profile reproduces generation at the target module."""
+        for M, Z, X in [(0.5, 25, 0.2), (2.0, -60, 0.0), (0.05, 200, -0.1)]:
+            shape = (Z, 20.0, X, 0.05, 1.0, 1.25, 0.2, 0.1) + SEGMENTS
+            expected = geometry_generator.generate_tooth_profile(M, *shape)
+            self.assertProfilesClose(profile_templates.tooth_profile(M, *shape), expected)
+
+    def test_standard_pack_is_memory_mapped_and_used(self):
+        pack = profile_templates.get_default_pack()
+        self.assertIsNotNone(pack)
+        self.assertIsInstance(pack.points, np.memmap)
+        shape = (40, 20.0, 0.0, 0.0, 1.0, 1.25, 0.38, 0.0) + SEGMENTS
+        self.assertIn(profile_templates.template_key(*shape), pack)
+        expected = geometry_generator.generate_tooth_profile(1.5, *shape)
+        self.assertProfilesClose(profile_templates.tooth_profile(1.5, *shape), expected)
+
+    def test_default_design_is_in_the_pack(self):
+        params = config_manager.get_default_calculation_params(config_manager.DEFAULT_APP_CONFIG)
+        pack = profile_templates.get_default_pack()
+        segments = tuple(params[key] for key in profile_templates.SHAPE_PARAMS[8:])
+        for Z, X in ((params['Z'], params['X']), (params['z2'], params['x2'])):
+            shape = (Z, params['ALPHA'], X, params['B'], params['A'], params['D'], params['C'], params['E'])
+            self.assertIn(profile_templates.template_key(*shape, *segments), pack)
+
+    def test_module_family_and_offset(self):
+        shape = (30, 20.0, 0.2, 0.05, 1.0, 1.25, 0.2, 0.1) + SEGMENTS
+        modules = [0.1, 0.3, 1.0]
+        X, Y, Z_calc, _, _ = profile_templates.module_family(modules, *shape)
+        self.assertEqual(X.shape[0], 3)
+        for i, M in enumerate(modules):
+            direct = geometry_generator.generate_tooth_profile(M, *shape)
+            np.testing.assert_allclose(X[i], direct[0], rtol=1e-12, atol=1e-12)
+            np.testing.assert_allclose(Y[i], direct[1], rtol=1e-12, atol=1e-12)
+        unit = profile_templates.unit_tooth_profile(*shape)
+        moved = profile_templates.scale_profile(unit, 2.0, x_offset=5.0, y_offset=-1.0)
+        np.testing.assert_allclose(moved[0], unit[0] * 2.0 + 5.0)
+        np.testing.assert_allclose(moved[1], unit[1] * 2.0 - 1.0)
+
+    def test_cached_unit_profiles_are_read_only(self):
+        shape = (33, 20.0, 0.3, 0.05, 1.0, 1.25, 0.2, 0.1) + SEGMENTS
+        unit = profile_templates.unit_tooth_profile(*shape)
+        with self.assertRaises(ValueError):
+            unit[0][0] = 1.0
+        scaled = profile_templates.tooth_profile(1.0, *shape)
+        scaled[0][0] = 1.0  # scaled copies belong to the caller
+
+    def test_build_and_load_pack_round_trip(self):
+        keys = [profile_templates.template_key(Z, 20.0, 0.0, 0.0, 1.0, 1.25, 0.25, 0.0, *SEGMENTS) for Z in (12, -48)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'pack')
+            self.assertEqual(profile_templates.build_template_pack(path, keys), 2)
+            pack = profile_templates.TemplatePack(path)
+            self.assertEqual(len(pack), 2)
+            for key in keys:
+                expected = geometry_generator.generate_tooth_profile(1.0, *key)
+                self.assertProfilesClose(pack.get(key), expected)
+            del pack
+
+    def test_shipped_pack_matches_the_generator(self):
+        """Regenerates every template of the shipped pack and compares it with the mapped data."""
+        pack = profile_templates.get_default_pack()
+        self.assertIsNotNone(pack, "The shipped pack is missing or stale; rebuild it with "
+                                   "python -m fine_gear_profile_generator.core.profile_templates")
+        self.assertEqual(set(pack.entries), set(profile_templates.standard_template_keys()))
+        for key in pack.entries:
+            X, Y, Z_calc, P_ANGLE, ALIGN_ANGLE = pack.get(key)
+            expected = geometry_generator.generate_tooth_profile(1.0, *key)
+            np.testing.assert_allclose(X, expected[0], rtol=1e-12, atol=1e-12, err_msg=str(key))
+            np.testing.assert_allclose(Y, expected[1], rtol=1e-12, atol=1e-12, err_msg=str(key))
+            self.assertEqual((Z_calc, P_ANGLE, ALIGN_ANGLE), tuple(expected[2:]))
+
+    def test_stale_pack_is_ignored_and_left_untouched(self):
+        keys = profile_templates.standard_template_keys()[:1]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'pack')
+            profile_templates.build_template_pack(path, keys)
+            with open(path + '.json') as f:
+                index = json.load(f)
+            index['generator'] = 'outdated'
+            with open(path + '.json', 'w') as f:
+                json.dump(index, f)
+            self.assertTrue(profile_templates.TemplatePack(path).is_stale())
+            before = os.path.getmtime(path + '.npy'), os.path.getmtime(path + '.json')
+
+            with mock.patch.multiple(profile_templates, DEFAULT_PACK=path, _default_pack=None,
+                                     _default_pack_loaded=False):
+                with self.assertWarns(UserWarning):
+                    self.assertIsNone(profile_templates.get_default_pack())
+                shape = (keys[0][0], 20.0, 0.0, 0.0, 1.0, 1.25, 0.38, 0.0) + SEGMENTS
+                expected = geometry_generator.generate_tooth_profile(1.0, *shape)
+                self.assertProfilesClose(profile_templates.tooth_profile(1.0, *shape), expected)
+            self.assertEqual((os.path.getmtime(path + '.npy'), os.path.getmtime(path + '.json')), before)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from fine_gear_profile_generator.core import gear_core
+from fine_gear_profile_generator.utils import profiler
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        """Set up gear pair parameters and a temporary directory for the trace."""
+        self.temp_dir = "temp_test_profile"
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self.params = {
+            'M': 1.0, 'Z': 18, 'z2': 36, 'ALPHA': 20.0, 'X': 0.2, 'x2': 0.0,
+            'B': 0.05, 'A': 1.0, 'D': 1.25, 'C': 0.2, 'E': 0.1,
+            'SEG_INVOLUTE': 15, 'SEG_EDGE_R': 15, 'SEG_ROOT_R': 15,
+            'SEG_OUTER': 5, 'SEG_ROOT': 5
+        }
+
+    def tearDown(self):
+        profiler.disable()
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_disabled_hooks_are_no_ops(self):
+        self.assertFalse(profiler.is_enabled())
+        self.assertIs(profiler.span('a'), profiler.span('b'))
+        profiler.count('points_generated', 10)  # Must not raise
+
+    def test_trace_contains_stages_and_counters(self):
+        trace_path = os.path.join(self.temp_dir, 'trace.json')
+        with profiler.profiling(trace_path):
+            gear_core.generate_gear_pair(self.params)
+
+        with open(trace_path) as f:
+            trace = json.load(f)
+
+        names = {event['name'] for event in trace['traceEvents'] if event['ph'] == 'X'}
+        self.assertIn('gear_core.contact_ratio', names)
+        self.assertIn('gear_core.tooth_profile', names)
+        self.assertGreater(trace['otherData']['counters']['points_generated'], 0)
+        for event in trace['traceEvents']:
+            self.assertIn('ts', event)
+            self.assertIn('pid', event)
+
+if __name__ == '__main__':
+    unittest.main()
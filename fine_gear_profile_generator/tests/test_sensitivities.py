@@ -0,0 +1,127 @@
+import unittest
+import sys
+import os
+import timeit
+
+import numpy as np
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from fine_gear_profile_generator.core import gear_math, geometry_generator, sensitivities
+
+PARAMS = {
+    'M': 1.0, 'Z': 25, 'z2': 36, 'ALPHA': 20.0, 'X': 0.2, 'x2': 0.0, 'B': 0.05,
+    'A': 1.0, 'D': 1.25, 'C': 0.2, 'E': 0.1, 'X_0': 0.0, 'Y_0': 0.0,
+    'SEG_INVOLUTE': 15, 'SEG_EDGE_R': 15, 'SEG_ROOT_R': 15, 'SEG_OUTER': 5, 'SEG_ROOT': 5,
+}
+STEP = 1e-6
+
+def _profile(params, gear):
+    Z, X = (params['Z'], params['X']) if gear == 1 else (params['z2'], params['x2'])
+    return geometry_generator.generate_tooth_profile(
+        params['M'], Z, params['ALPHA'], X, params['B'], params['A'], params['D'], params['C'], params['E'],
+        params['SEG_INVOLUTE'], params['SEG_EDGE_R'], params['SEG_ROOT_R'], params['SEG_OUTER'], params['SEG_ROOT'])
+
+def _analysis(params):
+    return np.array(gear_math.calculate_contact_ratio(
+        params['M'], params['Z'], params['z2'], params['X'], params['x2'], params['ALPHA'], params['A']))
+
+def _central_difference(func, params, name):
+    plus, minus = dict(params), dict(params)
+    plus[name] += STEP
+    minus[name] -= STEP
+    return (func(plus) - func(minus)) / (2 * STEP)
+
+class TestSensitivities(unittest.TestCase):
+
+    def check_against_finite_differences(self, params):
+        result = sensitivities.pair_sensitivities(params)
+        for i, name in enumerate(result['wrt']):
+            fd = _central_difference(_analysis, params, name)
+            self.assertAlmostEqual(result['contact_ratio'][1][i], fd[0], places=6, msg=name)
+            self.assertAlmostEqual(result['center_distance'][1][i], fd[1], places=6, msg=name)
+            for gear in (1, 2):
+                expected_X = _central_difference(lambda p: _profile(p, gear)[0], params, name)
+                expected_Y = _central_difference(lambda p: _profile(p, gear)[1], params, name)
+                np.testing.assert_allclose(result[f'gear{gear}']['dX'][:, i], expected_X, atol=1e-6, err_msg=name)
+                np.testing.assert_allclose(result[f'gear{gear}']['dY'][:, i], expected_Y, atol=1e-6, err_msg=name)
+
+    def test_external_pair_matches_finite_differences(self):
+        self.check_against_finite_differences(PARAMS)
+
+    def test_internal_pair_matches_finite_differences(self):
+        self.check_against_finite_differences(dict(PARAMS, z2=-100, x2=0.1))
+
+    def test_values_match_plain_evaluation(self):
+        result = sensitivities.pair_sensitivities(PARAMS)
+        contact_ratio, center_dist = _analysis(PARAMS)
+        self.assertAlmostEqual(float(result['contact_ratio'][0]), contact_ratio)
+        self.assertAlmostEqual(float(result['center_distance'][0]), center_dist)
+        for gear in (1, 2):
+            expected = _profile(PARAMS, gear)
+            np.testing.assert_allclose(result[f'gear{gear}']['profile'][0], expected[0])
+            np.testing.assert_allclose(result[f'gear{gear}']['profile'][1], expected[1])
+        # Gear 1 does not depend on x2, and the analysis does not depend on B, C or E
+        x2 = result['wrt'].index('x2')
+        self.assertFalse(result['gear1']['dX'][:, x2].any())
+        for name in ('B', 'C', 'E'):
+            self.assertEqual(result['contact_ratio'][1][result['wrt'].index(name)], 0.0)
+
+    def test_batch_stacks_designs(self):
+        designs = [dict(PARAMS, X=x) for x in (0.0, 0.2, 0.4)]
+        batch = sensitivities.batch_pair_sensitivities(designs, wrt=('X', 'ALPHA'))
+        self.assertEqual(batch['contact_ratio'].shape, (3,))
+        self.assertEqual(batch['d_center_distance'].shape, (3, 2))
+        single = sensitivities.pair_sensitivities(designs[1], wrt=('X', 'ALPHA'), profiles=False)
+        np.testing.assert_allclose(batch['d_contact_ratio'][1], single['contact_ratio'][1])
+
+    def test_batch_with_profiles_matches_single_designs(self):
+        """Mixed internal/external designs and segment counts give the single-design results."""
+        designs = [PARAMS, dict(PARAMS, z2=-100, x2=0.1), dict(PARAMS, X=-0.1, SEG_INVOLUTE=9, SEG_OUTER=3),
+                   dict(PARAMS, Z=40, ALPHA=25.0)]
+        batch = sensitivities.batch_pair_sensitivities(designs, profiles=True)
+        for i, params in enumerate(designs):
+            single = sensitivities.pair_sensitivities(params)
+            np.testing.assert_allclose(batch['d_contact_ratio'][i], single['contact_ratio'][1], rtol=1e-12, atol=1e-12)
+            np.testing.assert_allclose(batch['d_center_distance'][i], single['center_distance'][1], rtol=1e-12, atol=1e-12)
+            for gear in ('gear1', 'gear2'):
+                for key in ('dX', 'dY'):
+                    np.testing.assert_allclose(batch['profiles'][i][gear][key], single[gear][key], rtol=1e-12, atol=1e-12)
+
+    def test_cost(self):
+        """
+        One dual pass costs less than forward differences over the six parameters, and a
+        batch costs less per design than a single plain evaluation of the pair.
+        """
+        def plain(params=PARAMS):
+            _analysis(params)
+            _profile(params, 1)
+            _profile(params, 2)
+
+        def forward_differences():
+            plain()
+            for name in sensitivities.SENSITIVITY_PARAMS:
+                plain(dict(PARAMS, **{name: PARAMS[name] + STEP}))
+
+        def best(func, number):
+            return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+        designs = [dict(PARAMS, X=x, z2=z2) for x in np.linspace(-0.3, 0.5, 10) for z2 in range(30, 80)]
+        self.assertLess(best(lambda: sensitivities.pair_sensitivities(PARAMS), 20), best(forward_differences, 20))
+        per_design = best(lambda: sensitivities.batch_pair_sensitivities(designs, profiles=True), 2) / len(designs)
+        self.assertLess(per_design, best(plain, 50))
+
+    def test_rejects_integer_parameters(self):
+        with self.assertRaises(ValueError):
+            sensitivities.seed(PARAMS, wrt=('Z',))
+
+    def test_unsupported_array_function_arguments_raise_type_error(self):
+        x = sensitivities.seed(PARAMS, wrt=('X',))['X']
+        with self.assertRaises(TypeError):
+            np.linspace(0.0, x, 5, endpoint=False)
+        with self.assertRaises(TypeError):
+            np.concatenate([np.linspace(0.0, x, 3)[None], np.zeros((1, 3))], axis=1)
+
+if __name__ == '__main__':
+    unittest.main()
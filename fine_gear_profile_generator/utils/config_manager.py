@@ -0,0 +1,99 @@
+import json
+import os
+import sqlite3
+
+from ..io import design_library
+
+# Optional overrides are read from config.json in the package directory
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
+
+DEFAULT_APP_CONFIG = {
+    'window': {
+        'title': "FGPG - Fine Gear Profile Generator (Refactored)",
+        'geometry': "950x700",
+    },
+    'working_directory': "./result/",
+    'current_image_path': "Result1.png",
+    'design_library': os.path.join('~', '.fgpg', 'designs.sqlite'),
+    'defaults': {
+        'M': 1.0, 'Z': 25, 'ALPHA': 20.0, 'X': 0.2, 'B': 0.05,
+        'A': 1.0, 'D': 1.25, 'C': 0.2, 'E': 0.1,
+        'z2': 36, 'x2': 0.0, 'X_0': 0.0, 'Y_0': 0.0,
+        'SEG_INVOLUTE': 15, 'SEG_EDGE_R': 15, 'SEG_ROOT_R': 15,
+        'SEG_OUTER': 5, 'SEG_ROOT': 5,
+    },
+}
+
+def load_app_config(path=CONFIG_PATH):
+    """Returns the application config: built-in defaults merged with config.json, if present."""
+    config = json.loads(json.dumps(DEFAULT_APP_CONFIG))
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key].update(value)
+            else:
+                config[key] = value
+    return config
+
+def get_default_calculation_params(config_data):
+    """Returns typed calculation parameters (M, Z, z2, ...) for a headless run."""
+    return design_library.coerce_params(config_data.get('defaults', {}))
+
+def get_default_working_directory(config_data):
+    return config_data.get('working_directory', "./result/")
+
+def get_defaults(config_data):
+    """Returns default GUI field values keyed like the GUI widgets."""
+    defaults = design_library.ui_values_from_params(get_default_calculation_params(config_data))
+    defaults['working_directory'] = get_default_working_directory(config_data)
+    defaults['current_image_path'] = config_data.get('current_image_path', "Result1.png")
+    return defaults
+
+def get_design_library_path(config_data):
+    return os.path.expanduser(config_data.get('design_library', DEFAULT_APP_CONFIG['design_library']))
+
+def open_design_library(config_data=None):
+    return design_library.DesignLibrary(get_design_library_path(config_data or load_app_config()))
+
+def _library_name(working_dir):
+    return os.path.abspath(working_dir)
+
+def save_params(working_dir, data):
+    """
+    Saves GUI field values as a typed design named after `working_dir`.
+
+    Returns:
+        tuple: (success, message)
+    """
+    try:
+        params, analysis = design_library.params_from_ui_values(data)
+        with open_design_library() as library:
+            design_id = library.add_design(params, analysis, name=_library_name(working_dir))
+        return True, f"Save: OK (design #{design_id})"
+    except (ValueError, OSError, sqlite3.Error) as e:
+        return False, f"Could not save parameters: {e}"
+
+def load_params(working_dir):
+    """
+    Loads the latest design saved for `working_dir` as GUI field values.
+
+    If the library has none, a legacy Inputs.dat in `working_dir` is imported first.
+
+    Returns:
+        tuple: (success, data or error message)
+    """
+    try:
+        name = _library_name(working_dir)
+        with open_design_library() as library:
+            design = library.latest_design(name)
+            legacy_path = os.path.join(working_dir, design_library.LEGACY_FILENAME)
+            if design is None and os.path.exists(legacy_path):
+                library.import_inputs_dat([legacy_path])
+                design = library.latest_design(name)
+        if design is None:
+            return False, f"No saved design found for {name}"
+        return True, design_library.ui_values_from_params(design['params'], design['analysis'])
+    except (ValueError, OSError, sqlite3.Error) as e:
+        return False, f"Could not load parameters: {e}"
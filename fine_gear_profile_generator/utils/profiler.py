@@ -0,0 +1,176 @@
+"""
+Lightweight per-stage profiling hooks with Chrome trace-event output.
+
+Instrumented code calls `span()` and `count()` unconditionally. While no tracer
+is enabled both return immediately (a shared no-op context manager for `span`),
+so the hooks cost a global lookup when profiling is off.
+
+Work done in another process records into a tracer of its own, started with the
+parent's `origin_ns` so the timestamps line up, and is folded back with `merge()`.
+
+The saved JSON can be opened in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+_active_tracer: Optional['Tracer'] = None
+
+
+class _NullSpan:
+    """No-op context manager returned by `span()` while profiling is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Records a complete ('X') trace event covering the `with` block."""
+    __slots__ = ('tracer', 'name', 'args', 'start_ns')
+
+    def __init__(self, tracer: 'Tracer', name: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.add_complete_event(self.name, self.start_ns, end_ns, self.args)
+        return False
+
+
+class Tracer:
+    """Collects spans and counters in memory for a single profiling session."""
+
+    def __init__(self, origin_ns: Optional[int] = None):
+        self.pid = os.getpid()
+        # perf_counter is a system-wide monotonic clock, so child processes can share the origin
+        self.origin_ns = time.perf_counter_ns() if origin_ns is None else origin_ns
+        self.events: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _timestamp_us(self, t_ns: int) -> float:
+        return (t_ns - self.origin_ns) / 1000.0
+
+    def span(self, name: str, args: Dict[str, Any]) -> _Span:
+        return _Span(self, name, args)
+
+    def add_complete_event(self, name: str, start_ns: int, end_ns: int, args: Dict[str, Any]) -> None:
+        event = {
+            'name': name, 'ph': 'X', 'cat': name.split('.', 1)[0],
+            'ts': self._timestamp_us(start_ns), 'dur': (end_ns - start_ns) / 1000.0,
+            'pid': self.pid, 'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            self.events.append(event)
+
+    def count(self, name: str, value: float) -> None:
+        """Adds `value` to a cumulative counter and records a counter ('C') event."""
+        now_ns = time.perf_counter_ns()
+        with self._lock:
+            total = self.counters.get(name, 0) + value
+            self.counters[name] = total
+            self.events.append({
+                'name': name, 'ph': 'C', 'ts': self._timestamp_us(now_ns),
+                'pid': self.pid, 'args': {name: total},
+            })
+
+    def merge(self, events: List[Dict[str, Any]], counters: Dict[str, float]) -> None:
+        """Adds the events and counter totals recorded by a tracer in another process."""
+        now_ns = time.perf_counter_ns()
+        with self._lock:
+            self.events.extend(events)
+            for name, value in counters.items():
+                total = self.counters.get(name, 0) + value
+                self.counters[name] = total
+                self.events.append({
+                    'name': name, 'ph': 'C', 'ts': self._timestamp_us(now_ns),
+                    'pid': self.pid, 'args': {name: total},
+                })
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e['ts'])
+            counters = dict(self.counters)
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'counters': counters},
+        }
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+def span(name: str, **args: Any):
+    """Returns a context manager timing the enclosed stage as `name`."""
+    tracer = _active_tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, args)
+
+
+def count(name: str, value: float = 1) -> None:
+    """Increments the counter `name` by `value`."""
+    tracer = _active_tracer
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def is_enabled() -> bool:
+    return _active_tracer is not None
+
+
+def active_tracer() -> Optional[Tracer]:
+    """Returns the tracer of the current profiling session, if any."""
+    return _active_tracer
+
+
+def enable(origin_ns: Optional[int] = None) -> Tracer:
+    """Starts a new profiling session and returns its tracer."""
+    global _active_tracer
+    _active_tracer = Tracer(origin_ns)
+    return _active_tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stops the current profiling session and returns its tracer, if any."""
+    global _active_tracer
+    tracer, _active_tracer = _active_tracer, None
+    return tracer
+
+
+@contextmanager
+def profiling(output_path: Optional[str] = None) -> Iterator[Tracer]:
+    """Enables profiling for the block and optionally writes the trace on exit."""
+    tracer = enable()
+    try:
+        yield tracer
+    finally:
+        disable()
+        if output_path:
+            tracer.save(output_path)